@@ -1,86 +1,168 @@
-import schedule
+"""Warm-city pipeline: fetch, store, summarise, export and prune on a schedule.
+
+Importing this module has no side effects. Call setup() before the fetch
+jobs; `python -m weatherctl run-scheduler` (or running this file) does that
+and blocks in the scheduler loop.
+"""
 import sqlite3
 import requests
 from datetime import datetime
-import time
-import csv
 import logging
+import os
 from logging.handlers import RotatingFileHandler
+from weather_fetcher import fetch_all
+from scheduler import Scheduler
+from metrics import instrumented, span, start_http_server
+from pipeline_config import RETRY_DELAY, CityRegistry, ConfigWatcher, load_config, parse_shard
+from weather_writer import WeatherWriter
+from http_cache import ResponseCache
+from wttr_parser import parse_weather_payload
+from dedup import ObservationDeduper, observation_key
+import daily_summary
+import retention
+import weather_export
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(HERE, "refined_config.json")
+RECENT_SNAPSHOT = "recent_readings.npz"
+DB_PATH = 'weather.db'
+
+# Shared state, created by setup()
+writer = None
+response_cache = None
+deduper = None
+city_registry = None
+config_watcher = None
+latest_cache = None
+recent_readings = None
+
+
+def run_db():
+    # Resolved when each run ends, so runs follow the database setup() chose
+    return DB_PATH
+
 
 # === Set up rotating log ===
-log_handler = RotatingFileHandler(
-    "warm_weather_pipeline.log",
-    maxBytes = 1024 * 1024,  # 1 MB
-    backupCount = 3          # Keep 3 old logs
-)
-
-logging.basicConfig(
-    level = logging.INFO,
-    handlers = [log_handler],
-    format = '%(asctime)s - %(levelname)s - %(message)s'
-)
+def setup_logging(path="warm_weather_pipeline.log"):
+    log_handler = RotatingFileHandler(
+        path,
+        maxBytes = 1024 * 1024,  # 1 MB
+        backupCount = 3          # Keep 3 old logs
+    )
+
+    logging.basicConfig(
+        level = logging.INFO,
+        handlers = [log_handler],
+        format = '%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+
+def setup(db_path=DB_PATH, config_file=CONFIG_FILE, shard=None, live=True):
+    """Create the writer, caches and city registry the jobs share.
+
+    live=True also keeps the in-memory latest cache and recent-readings store
+    that the read API serves; one-shot runs leave them out (and skip numpy).
+    """
+    global DB_PATH, writer, response_cache, deduper, city_registry, config_watcher
+    global latest_cache, recent_readings
+    DB_PATH = db_path
+
+    # === Shared batched writer ===
+    writer = WeatherWriter(db_path)
+
+    if live:
+        from weather_api import LatestCache
+        from timeseries_store import TimeSeriesStore
+
+        # Latest reading per city for the read API, fed by every flush
+        latest_cache = LatestCache()
+        writer.listeners.append(latest_cache.update)
+        # Last 1440 readings per city in memory for rolling-window stats, kept across restarts
+        recent_readings = TimeSeriesStore.restore(RECENT_SNAPSHOT)
+
+    # wttr.in refreshes observations every 15-30 minutes, so cache responses for 15.
+    # Only current_condition is parsed and kept from each payload.
+    response_cache = ResponseCache(db_path, ttl=900, parse=parse_weather_payload)
+
+    # Last observation per city, warmed from last_updated
+    deduper = ObservationDeduper(db_path)
+
+    # === City registry ===
+    # Cities, poll intervals and priorities come from refined_config.json and are reloaded
+    # when the file changes. WEATHER_SHARD=i/n splits the cities across n processes.
+    shard = shard or parse_shard(os.environ.get("WEATHER_SHARD", "0/1"))
+    city_registry = CityRegistry.from_config(load_config(config_file), shard)
+    config_watcher = ConfigWatcher(config_file, city_registry)
+
+
+def close():
+    # Flushes buffered readings; the connections belong to the shared pool
+    writer.close()
+    snapshot_recent_readings()
+
 
 # === Export function ===
+def with_category(row):
+    city, date, condition, temp = row
+    category = "Hot" if temp >= 30 else "Warm"
+    return [city, date, condition, temp, category]
+
+@instrumented("refined_export_csv", db_path=run_db)
 def export_weather_to_csv():
     try:
-        conn = sqlite3.connect('weather.db')
-        cursor = conn.cursor()
+        filename = f"warm_cities_{datetime.now().strftime('%Y-%m-%d')}.csv"
+        # Streams rows in chunks and renames the finished file into place
+        path, count = weather_export.export_weather_to_csv(
+            DB_PATH, filename,
+            header=['City', 'Date', 'Condition', 'Temperature', 'Category'],
+            format_row=with_category
+        )
 
-        cursor.execute('SELECT * FROM weather')
-        rows = cursor.fetchall()
+        logging.info(f"Exported {count} weather rows to {path}")
+        print(f"Exported to {path}")
 
-        filename = f"warm_cities_{datetime.now().strftime('%Y-%m-%d')}.csv"
-        with open(filename, mode="w", newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(['City', 'Date', 'Condition', 'Temperature', 'Category'])
-            for row in rows:
-                city, date, condition, temp = row
-                category = "Hot" if temp >= 30 else "Warm"
-                writer.writerow([city, date, condition, temp, category])
-
-        logging.info(f"Exported weather data to {filename}")
-        print(f"Exported to {filename}")
-        
     except Exception as e:
         logging.error(f"Export failed: {e}")
         print("Export failed. Check logs.")
-        
-    finally:
-        if conn:
-            conn.close()
+
+@instrumented("refined_export_parquet", db_path=run_db)
+def export_weather_to_parquet():
+    try:
+        # pyarrow is only needed for this job, so import it on first use
+        import weather_parquet
+
+        count = weather_parquet.export_weather_to_parquet(DB_PATH, root='weather_parquet')
+        logging.info(f"Exported {count} new weather rows to weather_parquet/")
+        print(f"Exported {count} rows to weather_parquet/")
+
+    except Exception as e:
+        logging.error(f"Parquet export failed: {e}")
+        print("Parquet export failed. Check logs.")
 
 # === Fetching + Storing function ===
 def job():
-    cities = ["London", "Hyderabad", "Kolkata", "Chennai", "Auckland", "Tokyo"]
-    conn = sqlite3.connect('weather.db')
-    cursor = conn.cursor()
-
-    # Create weather table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weather (
-            city TEXT,
-            date TEXT,
-            state TEXT,
-            temp REAL
-        )
-    ''')
-
-    # Create last_updated table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS last_updated (
-            city TEXT PRIMARY KEY,
-            last_fetch TEXT
-        )
-    ''')
+    # Only cities whose poll interval has elapsed, highest priority first
+    cities = city_registry.due(limit=config_watcher.config.get("max_cities_per_tick"))
+    if cities:
+        fetch_and_store(cities)
 
+@instrumented("refined_fetch", db_path=run_db)
+def fetch_and_store(cities):
     skipped_count = 0
     
-    for city in cities:
+    with span("fetch"):
+        # Whole fetch stage gets 30s; a down upstream trips the breaker instead of timing out per city
+        results = fetch_all(cities, cache=response_cache, deadline=30)
+
+    # A failed poll is retried shortly instead of waiting out the city's whole interval
+    failed = city_registry.retry([city for city, data, error in results if error is not None])
+    if failed:
+        logging.warning(f"Polls failed for {len(failed)} cities, retrying in {RETRY_DELAY}s: {', '.join(failed)}")
+
+    for city, data, error in results:
         try:
-            url = f"https://wttr.in/{city}?format=j1"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            if error:
+                raise error
 
             current = data['current_condition'][0]
             condition = current['weatherDesc'][0]['value']
@@ -93,18 +175,16 @@ def job():
                 continue
 
             if temp > 20:
-                # Insert weather
-                cursor.execute('''
-                    INSERT INTO weather (city, date, state, temp)
-                    VALUES (?, ?, ?, ?)
-                ''', (city, date, condition, temp))
-
-                # Update last_updated
-                cursor.execute('''
-                    INSERT INTO last_updated (city, last_fetch)
-                    VALUES (?, ?)
-                    ON CONFLICT(city) DO UPDATE SET last_fetch = excluded.last_fetch
-                ''', (city, date))
+                # Same upstream observation as last time: nothing new to store
+                observation = observation_key(current)
+                if not deduper.is_new(city, observation):
+                    logging.info(f"Unchanged observation skipped for {city}")
+                    continue
+
+                # Buffer weather + last_updated; written on flush
+                writer.add(city, date, condition, temp, observation)
+                if recent_readings is not None:
+                    recent_readings.append(city, datetime.now().timestamp(), temp, current.get('humidity'), condition)
 
                 logging.info(f"Weather fetched and saved for {city}")
                 print(f"Weather in {city}")
@@ -127,74 +207,84 @@ def job():
         logging.info(f"Skipped {skipped_count} records in this run.")
         print(f"Total records skipped: {skipped_count}")
 
-    conn.commit()
-    conn.close()
+    logging.info(f"HTTP cache counters: {response_cache.counters()}")
 
+    # One transaction for the whole run
+    try:
+        with span("write"):
+            writer.flush()
+    except sqlite3.Error as e:
+        logging.error(f"DB error while writing batch: {e}")
+        print("DB error while writing batch")
+
+@instrumented("refined_summary", db_path=run_db)
 def update_daily_summary():
     try:
-        conn = sqlite3.connect('weather.db')
-        cursor = conn.cursor()
-        
-        # Create the daily summary table if not exists
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_summary_new (
-                city TEXT,
-                date TEXT,
-                avg_temp REAL,
-                min_temp REAL,
-                max_temp REAL,
-                category TEXT,
-                PRIMARY KEY (city, date)
-            )
-        ''')
-        
-        # Aggregate data from weather table
-        cursor.execute('''
-            SELECT city, DATE(date), AVG(temp), MIN(temp), MAX(temp)
-            FROM weather
-            GROUP BY city, DATE(date)
-        ''')
-        
-        rows = cursor.fetchall()
-        
-        for row in rows:
-            city, date, avg_temp, min_temp, max_temp = row
-            
-            if avg_temp >= 30:
-                category = "Hot"
-            elif avg_temp >= 20:
-                category = "Warm"
-            else:
-                category = "Cool"
-            
-            # Insert or update summary table
-            cursor.execute('''
-                INSERT INTO daily_summary_new (city, date, avg_temp, min_temp, max_temp, category)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(city, date) DO UPDATE SET
-                    avg_temp = excluded.avg_temp,
-                    min_temp = excluded.min_temp,
-                    max_temp = excluded.max_temp,
-                    category = excluded.category
-            ''', (city, date, avg_temp, min_temp, max_temp, category))
-        
-        conn.commit()
+        # Only readings added since the last run are aggregated
+        processed = daily_summary.update_daily_summary(DB_PATH)
+        logging.info(f"Daily summary updated with {processed} new readings")
         print("Daily summary updated successfully.")
-        
-    
+
     except Exception as e:
+        logging.error(f"Error updating daily summary: {e}")
         print(f"Error updating daily summary: {e}")
-    
-    finally:
-        conn.close()
-     
+
+
+@instrumented("refined_retention", db_path=run_db)
+def apply_retention():
+    try:
+        # Rolls up first, then deletes old raw rows in small batches
+        options = config_watcher.config.get("retention", {})
+        stats = retention.run_retention(DB_PATH, **options)
+        logging.info(f"Retention: {stats}")
+        print(f"Retention applied: {stats['raw_deleted']} old readings removed")
+
+    except Exception as e:
+        logging.error(f"Error applying retention: {e}")
+        print(f"Error applying retention: {e}")
+
+
+def snapshot_recent_readings():
+    if recent_readings is None:
+        return
+    try:
+        recent_readings.snapshot(RECENT_SNAPSHOT)
+    except OSError as e:
+        logging.error(f"Could not snapshot recent readings: {e}")
+
 
 # === Scheduling ===
-schedule.every(1).minutes.do(job)
-schedule.every().day.at("15:54").do(update_daily_summary)
-schedule.every().day.at("15:55").do(export_weather_to_csv)
+def build_scheduler(max_workers=4):
+    scheduler = Scheduler(max_workers=max_workers)
+    # Ticks often; each city is only fetched once its own interval has passed
+    scheduler.every(10, job)
+    scheduler.every(5, config_watcher.check, name="reload_config")
+    scheduler.every(60, update_daily_summary)
+    scheduler.daily("15:55", export_weather_to_csv)
+    scheduler.daily("15:55", export_weather_to_parquet)
+    scheduler.daily("03:30", apply_retention)
+    scheduler.every(300, snapshot_recent_readings)
+    return scheduler
+
+def run_scheduler(max_workers=4, metrics_port=None, api_port=None):
+    """Run every job on its schedule until SIGINT/SIGTERM. Needs setup()."""
+    # Prometheus scrape endpoint, e.g. WEATHER_METRICS_PORT=9108
+    if metrics_port:
+        start_http_server(metrics_port)
+    # Read API for dashboards, e.g. WEATHER_API_PORT=8080
+    if api_port:
+        from weather_api import ReadService, start_api_server
+        start_api_server(ReadService(DB_PATH, cache=latest_cache, store=recent_readings), api_port)
+
+    try:
+        # Blocks until SIGINT/SIGTERM, then lets running jobs finish
+        build_scheduler(max_workers).run_forever()
+    finally:
+        close()
 
 # === Run loop ===
-while True:
-    schedule.run_pending()
-    time.sleep(1)
+if __name__ == "__main__":
+    setup_logging()
+    setup()
+    run_scheduler(metrics_port=int(os.environ.get("WEATHER_METRICS_PORT") or 0),
+                  api_port=int(os.environ.get("WEATHER_API_PORT") or 0))
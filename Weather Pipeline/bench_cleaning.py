@@ -0,0 +1,67 @@
+import os
+import sys
+
+# Shared modules (db, db_schema, ...) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from cleaned_weather_pipeline import simulate_messy_data
+from cleaning_engine import clean_batch
+from columnar_cleaning import clean_columnar, to_columns
+
+# === Row loop vs columnar cleaning (no DB writes) ===
+SIZES = [100_000, 1_000_000, 2_000_000]
+
+# Spellings float() accepts or rejects that the simulated data never produces
+EDGE_TEMPERATURES = ["21.11111111111111", "0.30000000000000004", "1234567890123456789", "nan", "-inf", "1e1",
+                     "1_0", "\u0661\u0662", "\uff11\uff15", " +7. ", ".5", "-.5", "5.", ".", "-", "+",
+                     "1.2.3", "--1", "12a", "N/A", "", "   ", "\t15\n", "-0", "60", "60.0000000000001", "-50",
+                     "Infinity", "NaN", "1E+1", "2e-3", "15°C", "tiny", "_1", "1__0", "1_000"]
+
+
+def check_parity(records):
+    """Assert columnar cleaning keeps exactly the rows clean_batch keeps."""
+    rows, row_skipped = clean_batch(records)
+    columns, skipped = clean_columnar(records)
+    kept = list(zip(columns["city"].tolist(), columns["temperature"].tolist(), columns["condition"].tolist()))
+    assert row_skipped == sum(skipped.values()), (row_skipped, skipped)
+    assert len(rows) == len(kept)
+    for expected, actual in zip(rows, kept):
+        same_temp = expected[1] == actual[1] or (expected[1] != expected[1] and actual[1] != actual[1])
+        assert expected[0] == actual[0] and same_temp and expected[2] == actual[2], (expected, actual)
+    return len(records)
+
+if __name__ == "__main__":
+    base = simulate_messy_data()
+    edge = [{"city": city, "temperature": temp, "condition": condition}
+            for temp in EDGE_TEMPERATURES
+            for city, condition in (("Paris", "Sunny"), (" ", "Rain"), ("Oslo", ""))]
+    print(f"Parity with clean_batch: {check_parity(base + edge)} records agree\n")
+
+    for size in SIZES:
+        data = (base * (size // len(base) + 1))[:size]
+        city, temperature, condition = to_columns(data)
+        arrays_in = {"city": city, "temperature": temperature, "condition": condition}
+
+        start = time.perf_counter()
+        rows, row_skipped = clean_batch(data)
+        row_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns, skipped = clean_columnar(data)
+        dict_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clean_columnar(arrays_in)
+        col_time = time.perf_counter() - start
+
+        # Same rows kept, same number dropped; check_parity above compares the values too
+        assert len(rows) == len(columns["city"])
+        assert row_skipped == sum(skipped.values())
+
+        print(f"{size:>9} records | rows: {row_time:.3f}s "
+              f"| columnar from dicts: {dict_time:.3f}s ({row_time / dict_time:.1f}x) "
+              f"| columnar from arrays: {col_time:.3f}s ({row_time / col_time:.1f}x)")
+
+    print(f"\nSkip breakdown for the last batch: {skipped}")
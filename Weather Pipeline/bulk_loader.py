@@ -0,0 +1,267 @@
+"""Stream CSV / JSON / JSONL files into the weather store with the usual cleaning rules.
+
+    python bulk_loader.py weather_2025-04-07.csv --table weather
+    python bulk_loader.py history/*.jsonl --db ../weather.db --batch-size 100000
+    python bulk_loader.py big.json --offset 0 --no-resume     # start over
+
+Each batch is written in one transaction together with the byte offset it
+ends at, so a crashed load resumes from the last committed batch.
+"""
+import os
+import sys
+
+# Shared modules (db, db_schema, ...) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import codecs
+import csv
+import glob
+import json
+import time
+from datetime import datetime
+
+import metrics
+from cleaning_engine import clean_record
+from db import get_database
+
+# Column names seen in our exports and upstream feeds, lower-cased
+FIELD_ALIASES = {
+    "city": ("city", "name", "location"),
+    "temperature": ("temperature", "temp", "temp_c"),
+    "condition": ("condition", "state", "weather", "description"),
+    "date": ("date", "timestamp", "time", "observed_at")
+}
+
+TARGETS = {
+    # Same table as clean_and_store; dates are not kept
+    "cleaned_weather": 'INSERT INTO cleaned_weather (city, temperature, condition) VALUES (?, ?, ?)',
+    # Raw history with dates, e.g. backfilling old weather_*.csv exports
+    "weather": 'INSERT INTO weather (city, date, state, temp) VALUES (?, ?, ?, ?)'
+}
+
+READ_SIZE = 1024 * 1024
+
+_field_maps = {}
+
+
+# === Readers ===
+# Each reader yields (record, end_offset): end_offset is the byte position
+# just after the record, which is where a resumed load starts.
+def read_jsonl(path, offset=0):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                yield json.loads(line), offset
+
+
+def read_csv(path, offset=0):
+    with open(path, "rb") as f:
+        # The header is always read from the top, even when resuming mid-file
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8-sig")]))
+        position = max(offset, len(header_line))
+        f.seek(position)
+
+        def lines():
+            nonlocal position
+            for line in f:
+                position += len(line)
+                yield line.decode("utf-8")
+
+        # csv pulls extra lines itself for quoted newlines, so position is always past the row
+        for row in csv.reader(lines()):
+            if row:
+                yield dict(zip(header, row)), position
+
+
+def read_json_array(path, offset=0):
+    # Walks a top-level [...] array one object at a time instead of json.load()
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        f.seek(offset)
+        text, position, eof = "", offset, False
+        while True:
+            pos = 0
+            while True:
+                separators_at = pos
+                while pos < len(text) and text[pos] in " \t\r\n,[":
+                    pos += 1
+                if pos < len(text) and text[pos] == "]":
+                    return
+                try:
+                    record, end = decoder.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    # Incomplete object at the end of the buffer: read more
+                    pos = separators_at
+                    break
+                position += len(text[separators_at:end].encode("utf-8"))
+                pos = end
+                yield record, position
+
+            text = text[pos:]
+            if eof:
+                if text.strip(" \t\r\n,[]"):
+                    raise ValueError(f"{path}: malformed JSON near byte {position}")
+                return
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            text += text_decoder.decode(chunk, final=eof)
+
+
+READERS = {"jsonl": read_jsonl, "csv": read_csv, "json": read_json_array}
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in READERS:
+        return extension
+    raise ValueError(f"Cannot tell the format of {path}; pass --format")
+
+
+def field_map(keys):
+    # Which source key feeds each cleaner field; files repeat the same keys, so cache it
+    mapping = _field_maps.get(keys)
+    if mapping is None:
+        lowered = {str(key).strip().lower(): key for key in keys}
+        mapping = tuple(
+            (field, next((lowered[alias] for alias in aliases if alias in lowered), None))
+            for field, aliases in FIELD_ALIASES.items()
+        )
+        _field_maps[keys] = mapping
+    return mapping
+
+
+def normalize(record):
+    # Map whatever the source calls its columns onto the cleaner's field names
+    normalized = {}
+    for field, key in field_map(tuple(record)):
+        value = record.get(key) if key is not None else None
+        normalized[field] = "" if value is None else str(value)
+    return normalized
+
+
+# === Checkpoints ===
+def get_checkpoint(conn, source, target):
+    row = conn.execute('SELECT byte_offset, loaded, skipped FROM load_checkpoints WHERE source = ? AND target = ?',
+                       (source, target)).fetchone()
+    return row or (0, 0, 0)
+
+
+def save_checkpoint(conn, source, target, offset, loaded, skipped):
+    conn.execute('''
+        INSERT INTO load_checkpoints (source, target, byte_offset, loaded, skipped, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source, target) DO UPDATE SET
+            byte_offset = excluded.byte_offset,
+            loaded = excluded.loaded,
+            skipped = excluded.skipped,
+            updated_at = excluded.updated_at
+    ''', (source, target, offset, loaded, skipped, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+
+# === Loader ===
+def load_file(path, db_path='weather.db', table="cleaned_weather", fmt=None, batch_size=50000,
+              resume=True, offset=None, min_temp=-50, max_temp=60):
+    """Stream one file into table and return load stats.
+
+    With resume=True the load continues from the offset stored for this
+    file and table; offset overrides that. The stored offset only moves
+    forward in the same transaction as the rows it covers.
+    """
+    if table not in TARGETS:
+        raise ValueError(f"Unknown table {table}; expected one of {sorted(TARGETS)}")
+    reader = READERS[fmt or detect_format(path)]
+    source = os.path.abspath(path)
+    database = get_database(db_path)
+    insert = TARGETS[table]
+    with_date = table == "weather"
+
+    with database.connection() as conn:
+        start_offset, loaded, skipped = get_checkpoint(conn, source, table) if resume else (0, 0, 0)
+    if offset is not None:
+        start_offset, loaded, skipped = offset, 0, 0
+    if start_offset > os.path.getsize(path):
+        raise ValueError(f"{path} is smaller than the saved offset {start_offset}; reload with --no-resume")
+
+    start = time.perf_counter()
+    records = 0
+    batch = []
+    batch_skipped = 0
+    end_offset = start_offset
+
+    def commit():
+        nonlocal loaded, skipped, batch, batch_skipped
+        commit_start = time.perf_counter()
+        with database.transaction() as conn:
+            if batch:
+                conn.executemany(insert, batch)
+            save_checkpoint(conn, source, table, end_offset, loaded + len(batch), skipped + batch_skipped)
+        metrics.observe("db_commit_seconds", time.perf_counter() - commit_start, table=table)
+        metrics.inc("rows_written_total", len(batch), table=table)
+        loaded += len(batch)
+        skipped += batch_skipped
+        batch, batch_skipped = [], 0
+
+    for record, end_offset in reader(path, start_offset):
+        records += 1
+        fields = normalize(record) if isinstance(record, dict) else None
+        row = clean_record(fields, min_temp, max_temp) if fields else None
+        if row is None or (with_date and not fields["date"].strip()):
+            batch_skipped += 1
+        else:
+            city, temp, condition = row
+            batch.append((city, fields["date"].strip(), condition, temp) if with_date else row)
+        if len(batch) + batch_skipped >= batch_size:
+            commit()
+    commit()
+
+    seconds = time.perf_counter() - start
+    metrics.inc("records_processed_total", records, stage="load")
+    return {
+        "source": source,
+        "table": table,
+        "records": records,
+        "loaded": loaded,
+        "skipped": skipped,
+        "offset": end_offset,
+        "seconds": seconds,
+        "records_per_sec": records / seconds if seconds else 0.0
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load CSV / JSON / JSONL weather files.")
+    parser.add_argument("paths", nargs="+", help="files or glob patterns")
+    parser.add_argument("--db", default="weather.db")
+    parser.add_argument("--table", choices=sorted(TARGETS), default="cleaned_weather")
+    parser.add_argument("--format", choices=sorted(READERS))
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--offset", type=int, help="start at this byte offset instead of the checkpoint")
+    parser.add_argument("--no-resume", action="store_true", help="ignore saved checkpoints")
+    parser.add_argument("--min-temp", type=float, default=-50)
+    parser.add_argument("--max-temp", type=float, default=60)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = [path for pattern in args.paths for path in sorted(glob.glob(pattern)) or [pattern]]
+
+    with metrics.PipelineRun("bulk_load", args.db):
+        for path in paths:
+            with metrics.span("load"):
+                stats = load_file(path, args.db, args.table, args.format, args.batch_size,
+                                  resume=not args.no_resume, offset=args.offset,
+                                  min_temp=args.min_temp, max_temp=args.max_temp)
+            print(f"{path}: {stats['records']} records read, {stats['loaded']} loaded, "
+                  f"{stats['skipped']} skipped in total, "
+                  f"{stats['records_per_sec']:.0f} records/sec (offset {stats['offset']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
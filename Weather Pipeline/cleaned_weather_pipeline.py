@@ -0,0 +1,34 @@
+from db import get_database
+from datetime import datetime
+from cleaning_engine import run_cleaning
+import report_engine
+
+def simulate_messy_data():
+    return [
+        {"city": "  Tokyo ", "temperature": " 29.5 ", "condition": " Sunny "},
+        {"city": "Chennai", "temperature": "N/A", "condition": "  Cloudy"},
+        {"city": "London", "temperature": "15C", "condition": "Rainy "},
+        {"city": "", "temperature": "25.3", "condition": "Clear"},
+        {"city": "Kolkata", "temperature": " 42 ", "condition": ""},
+        {"city": "Delhi", "temperature": "38.2", "condition": "Hazy"},
+        {"city": "Mumbai", "temperature": "", "condition": "Humid"},
+        {"city": "Auckland", "temperature": "17", "condition": "Windy"},
+    ]
+
+def clean_and_store_parallel(data, db_path, min_temp=-50, max_temp=60, num_threads=4, mode="rows"):
+    # Cleaning runs in worker processes; a single writer does all inserts
+    stats = run_cleaning(data, db_path, min_temp=min_temp, max_temp=max_temp, workers=num_threads, mode=mode)
+    print(f"Cleaned {stats['total']} records at {stats['records_per_sec']:.0f} records/sec")
+    return stats["total"], stats["cleaned"], stats["skipped"]
+
+def log_cleaning_run(db_path, total, cleaned, skipped):
+    with get_database(db_path).transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO cleaning_log (timestamp, total_records, cleaned, skipped)
+            VALUES (?, ?, ?, ?)
+        ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), total, cleaned, skipped))
+
+def generate_weather_report(thresholds, output_folder, db_path, extra_aggregates=(), use_cache=True):
+    # Reuses cached aggregates and only scans rows added since; see report_engine
+    return report_engine.generate_weather_report(thresholds, output_folder, db_path, extra_aggregates, use_cache)
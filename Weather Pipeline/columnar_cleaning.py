@@ -0,0 +1,161 @@
+import numpy as np
+
+SKIP_REASONS = ("missing_temperature", "non_numeric", "missing_city", "missing_condition", "out_of_range")
+
+
+def to_string_array(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind == "U":
+        return values
+    return np.array(values, dtype=str)
+
+
+def to_columns(records):
+    """Turn a list of record dicts, or a dict of columns, into three string arrays."""
+    if isinstance(records, dict):
+        columns = records
+    else:
+        # One pass per field; everything after this works on whole arrays
+        columns = {field: [r.get(field, "") for r in records] for field in ("city", "temperature", "condition")}
+    return (to_string_array(columns["city"]),
+            to_string_array(columns["temperature"]),
+            to_string_array(columns["condition"]))
+
+
+def parse_decimals(values):
+    """Parse plain decimals ("-12", "29.5") straight from the UTF-32 code points.
+
+    Returns (floats, ok); rows that are not a plain decimal get NaN and ok=False.
+    """
+    values = np.ascontiguousarray(values)
+    n, width = len(values), values.dtype.itemsize // 4
+    if n == 0 or width == 0:
+        return np.full(n, np.nan), np.zeros(n, dtype=bool)
+
+    # Walk the (short) string width one character column at a time over all rows
+    codes = values.view(np.uint32).reshape(n, width).T.copy()
+    mantissa = np.zeros(n, dtype=np.int64)
+    digit_count = np.zeros(n, dtype=np.int32)
+    frac_digits = np.zeros(n, dtype=np.int32)
+    seen_dot = np.zeros(n, dtype=bool)
+    bad = np.zeros(n, dtype=bool)
+
+    for j, column in enumerate(codes):
+        digit = column - 48  # wraps around for code points below "0"
+        is_digit = digit < 10
+        is_dot = column == 46
+        allowed = is_digit | is_dot | (column == 0)
+        if j == 0:
+            allowed |= (column == 45) | (column == 43)
+        bad |= ~allowed | (is_dot & seen_dot)
+        seen_dot |= is_dot
+        digit_count += is_digit
+        frac_digits += is_digit & seen_dot
+        mantissa = np.where(is_digit, mantissa * 10 + digit, mantissa)
+
+    # Up to 15 digits the integer mantissa is exact, so mantissa / 10**k rounds like float()
+    ok = ~bad & (digit_count > 0) & (digit_count <= 15)
+
+    parsed = mantissa / np.power(10.0, frac_digits)
+    parsed[codes[0] == 45] *= -1
+    parsed[~ok] = np.nan
+    return parsed, ok
+
+
+# ASCII characters float() can accept once the value is stripped: digits, sign, point,
+# exponent, underscores between digits and the letters of "inf", "infinity" and "nan"
+_FLOAT_ASCII = np.zeros(128, dtype=bool)
+_FLOAT_ASCII[[ord(c) for c in "0123456789+-._eEiInNfFtTyYaA"]] = True
+_FLOAT_ASCII[0] = True  # padding of shorter strings in the array
+
+
+def maybe_float(values):
+    """False where float() is certain to reject the value ("N/A", "15C", ...).
+
+    Checked on the code points of all rows at once; anything outside ASCII may
+    be a Unicode digit and is left for float() to decide.
+    """
+    values = np.ascontiguousarray(values)
+    n, width = len(values), values.dtype.itemsize // 4
+    if n == 0 or width == 0:
+        return np.zeros(n, dtype=bool)
+    codes = values.view(np.uint32).reshape(n, width)
+    non_ascii = codes >= 128
+    allowed = (_FLOAT_ASCII[np.minimum(codes, 127)] | non_ascii).all(axis=1)
+    # Every accepted spelling has a digit, or an "n" (inf, nan), or may hold a Unicode digit
+    has_digit = (((codes >= 48) & (codes <= 57)) | (codes == 110) | (codes == 78) | non_ascii).any(axis=1)
+    return allowed & has_digit
+
+
+def coerce_temperatures(raw, allow_units=False):
+    """Parse a string array to float64 the way clean_record's float() does.
+
+    Returns (temps, present, numeric). numeric is False where float() would
+    raise; "nan" parses, so a NaN temperature alone does not mean non-numeric.
+    With allow_units, a trailing C / °C is dropped so "15C" parses as 15.0.
+    """
+    values = np.char.strip(raw)
+    if allow_units:
+        values = np.char.rstrip(np.char.rstrip(values, "Cc°"))
+
+    temps, numeric = parse_decimals(values)
+    present = np.char.str_len(values) > 0
+
+    # Plain junk is rejected in bulk; only the rare spellings the fast path does not
+    # handle (exponents, inf/nan, underscores, more than 15 digits, non-ASCII digits)
+    # go through float(), so both modes agree without a Python call per bad row
+    rest = np.flatnonzero(present & ~numeric)
+    rest = rest[maybe_float(values[rest])]
+    for i, text in zip(rest.tolist(), values[rest].tolist()):
+        try:
+            temps[i] = float(text)
+            numeric[i] = True
+        except ValueError:
+            pass
+
+    return temps, present, numeric
+
+
+def is_blank(values):
+    return (np.char.str_len(values) == 0) | np.char.isspace(values)
+
+
+def clean_columnar(records, min_temp=-50, max_temp=60, allow_units=False):
+    """Clean a batch of raw records column-wise.
+
+    records is a list of dicts like simulate_messy_data() returns, or a dict of
+    city / temperature / condition columns.
+    Returns (columns, skipped) where columns maps city / temperature / condition
+    to arrays of the kept rows and skipped counts dropped rows per reason.
+    """
+    city, raw_temp, condition = to_columns(records)
+    temps, present, numeric = coerce_temperatures(raw_temp, allow_units)
+
+    # Each dropped row is charged to the first rule it fails, in the same order as clean_record
+    missing_temp = ~present
+    non_numeric = present & ~numeric
+    parsed = ~(missing_temp | non_numeric)
+    missing_city = parsed & is_blank(city)
+    missing_condition = parsed & ~missing_city & is_blank(condition)
+    with np.errstate(invalid="ignore"):
+        out_of_range = (parsed & ~missing_city & ~missing_condition &
+                        ((temps < min_temp) | (temps > max_temp)))
+
+    keep = parsed & ~missing_city & ~missing_condition & ~out_of_range
+    # Only the surviving rows need trimming
+    columns = {
+        "city": np.char.strip(city[keep]),
+        "temperature": temps[keep],
+        "condition": np.char.strip(condition[keep])
+    }
+    skipped = {
+        "missing_temperature": int(missing_temp.sum()),
+        "non_numeric": int(non_numeric.sum()),
+        "missing_city": int(missing_city.sum()),
+        "missing_condition": int(missing_condition.sum()),
+        "out_of_range": int(out_of_range.sum())
+    }
+    return columns, skipped
+
+
+def columns_to_rows(columns):
+    return list(zip(columns["city"].tolist(), columns["temperature"].tolist(), columns["condition"].tolist()))
@@ -1,13 +1,9 @@
-import json
 import os
 
-def load_config():
-    # Dynamically get the path where this file is located
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    config_file = os.path.join(base_dir, "config.json")
+import pipeline_config
 
-    if not os.path.exists(config_file):
-        raise FileNotFoundError(f"Configuration file {config_file} not found.")
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
 
-    with open(config_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+def load_config():
+    # Validated once and cached until config.json changes on disk
+    return pipeline_config.load_config(CONFIG_FILE)
@@ -1,35 +1,75 @@
-import time
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Shared modules (db, db_schema, ...) live in the repository root; the cleaning
+# modules next to this file are imported by bare name from any working directory
+for path in (os.path.dirname(HERE), HERE):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
 from config_loader import load_config
-from cleaned_weather_pipeline import (
-    simulate_messy_data,
-    clean_and_store_parallel,
-    log_cleaning_run,
-    generate_weather_report
-)
+from metrics import PipelineRun, span
 
-if __name__ == "__main__":
-    overall_start = time.perf_counter()
 
-    config = load_config()
-    raw_data = simulate_messy_data()
+def resolve(path):
+    # Relative paths in config.json are relative to this folder, not the caller's cwd
+    return path if os.path.isabs(path) else os.path.join(HERE, path)
 
-    db_path = config.get("db_path", "weather.db")
-    thresholds = config["temperature_thresholds"]
-    output_folder = config["output_folder"]
 
-    print("Cleaning and storing data...")
-    clean_start = time.perf_counter()
-    total, cleaned, skipped = clean_and_store_parallel(raw_data, db_path, min_temp=-50, max_temp=60)
-    clean_end = time.perf_counter()
-    print(f"Cleaning done in {clean_end - clean_start:.4f} seconds\n")
+def settings(config=None):
+    config = config or load_config()
+    return (resolve(config.get("db_path", "weather.db")),
+            config["temperature_thresholds"],
+            resolve(config["output_folder"]))
+
 
+def clean(db_path=None, data=None):
+    """Clean a batch of raw records into cleaned_weather and log the run.
+
+    Returns (total, cleaned, skipped).
+    """
+    from cleaned_weather_pipeline import simulate_messy_data, clean_and_store_parallel, log_cleaning_run
+
+    db_path = db_path or settings()[0]
+    raw_data = simulate_messy_data() if data is None else data
+    total, cleaned, skipped = clean_and_store_parallel(raw_data, db_path, min_temp=-50, max_temp=60)
     log_cleaning_run(db_path, total, cleaned, skipped)
+    return total, cleaned, skipped
+
 
-    print("Generating weather report...")
-    report_start = time.perf_counter()
-    generate_weather_report(thresholds=thresholds, output_folder=output_folder, db_path=db_path)
-    report_end = time.perf_counter()
-    print(f"Report generated in {report_end - report_start:.4f} seconds\n")
+def report(db_path=None, thresholds=None, output_folder=None, use_cache=True):
+    """Write the weather report for cleaned_weather. Returns the report path.
 
-    overall_end = time.perf_counter()
-    print(f"Total pipeline execution time: {overall_end - overall_start:.4f} seconds")
\ No newline at end of file
+    Unchanged data returns the previous report instead of writing a copy.
+    """
+    from cleaned_weather_pipeline import generate_weather_report
+
+    default_db, default_thresholds, default_folder = settings()
+    return generate_weather_report(thresholds=thresholds or default_thresholds,
+                                   output_folder=output_folder or default_folder,
+                                   db_path=db_path or default_db,
+                                   use_cache=use_cache)
+
+
+def run(profile=False, trace_memory=False):
+    db_path, thresholds, output_folder = settings()
+
+    # Stage timings, counters and optional profiles are stored in pipeline_runs
+    with PipelineRun("cleaning_report", db_path, profile=profile, trace_memory=trace_memory) as pipeline_run:
+        print("Cleaning and storing data...")
+        with span("clean") as stage:
+            clean(db_path)
+        print(f"Cleaning done in {stage.seconds:.4f} seconds\n")
+
+        print("Generating weather report...")
+        with span("report") as stage:
+            report(db_path, thresholds, output_folder)
+        print(f"Report generated in {stage.seconds:.4f} seconds\n")
+
+    for line in pipeline_run.summary():
+        print(line)
+
+
+if __name__ == "__main__":
+    run()
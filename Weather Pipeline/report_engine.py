@@ -0,0 +1,358 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import metrics
+from db import get_database
+
+
+# === Aggregates ===
+# Each aggregate sees every row once through add() and renders its own report lines.
+# Extra aggregates can be passed to build_report / generate_weather_report; to be
+# cached they also need config(), state() and load_state() with JSON-safe values.
+class BucketCounts:
+    def __init__(self, thresholds):
+        self.hot_limit = thresholds["hot"]
+        self.warm_limit = thresholds["warm"]
+        self.hot = self.warm = self.cold = 0
+
+    def add(self, city, temperature, condition):
+        if temperature >= self.hot_limit:
+            self.hot += 1
+        elif temperature >= self.warm_limit:
+            self.warm += 1
+        else:
+            self.cold += 1
+
+    def config(self):
+        return {"hot": self.hot_limit, "warm": self.warm_limit}
+
+    def state(self):
+        return {"hot": self.hot, "warm": self.warm, "cold": self.cold}
+
+    def load_state(self, state):
+        self.hot, self.warm, self.cold = int(state["hot"]), int(state["warm"]), int(state["cold"])
+
+    def lines(self):
+        return [
+            f"Hot cities : {self.hot}",
+            f"Warm cities : {self.warm}",
+            f"Cold cities : {self.cold}"
+        ]
+
+
+class Extremes:
+    def __init__(self):
+        self.hottest = None
+        self.coldest = None
+
+    def add(self, city, temperature, condition):
+        if self.hottest is None or temperature > self.hottest[1]:
+            self.hottest = (city, temperature)
+        if self.coldest is None or temperature < self.coldest[1]:
+            self.coldest = (city, temperature)
+
+    def config(self):
+        return {}
+
+    def state(self):
+        return {"hottest": self.hottest, "coldest": self.coldest}
+
+    def load_state(self, state):
+        self.hottest = tuple(state["hottest"]) if state["hottest"] is not None else None
+        self.coldest = tuple(state["coldest"]) if state["coldest"] is not None else None
+
+    def lines(self):
+        return [
+            f"Hottest City : {self.hottest[0]} ({self.hottest[1]}°C)",
+            f"Coldest City : {self.coldest[0]} ({self.coldest[1]}°C)"
+        ]
+
+
+class Percentiles:
+    """Percentiles from a fixed-resolution histogram, so memory does not grow with rows."""
+
+    def __init__(self, percentiles=(50, 90), resolution=0.1):
+        self.percentiles = percentiles
+        self.resolution = resolution
+        self.counts = {}
+        self.total = 0
+
+    def add(self, city, temperature, condition):
+        bucket = round(temperature / self.resolution)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def value(self, percentile):
+        rank = max(1, -(-self.total * percentile // 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return round(bucket * self.resolution, 6)
+
+    def config(self):
+        return {"percentiles": list(self.percentiles), "resolution": self.resolution}
+
+    def state(self):
+        # JSON object keys are strings; load_state turns the buckets back into ints
+        return {"counts": {str(bucket): count for bucket, count in self.counts.items()}, "total": self.total}
+
+    def load_state(self, state):
+        self.counts = {int(bucket): int(count) for bucket, count in state["counts"].items()}
+        self.total = int(state["total"])
+
+    def lines(self):
+        return [f"P{p} temperature : {self.value(p)}°C" for p in self.percentiles]
+
+
+class ConditionCounts:
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, city, temperature, condition):
+        self.counts[condition] = self.counts.get(condition, 0) + 1
+
+    def config(self):
+        return {}
+
+    def state(self):
+        return {"counts": self.counts}
+
+    def load_state(self, state):
+        self.counts = {condition: int(count) for condition, count in state["counts"].items()}
+
+    def lines(self):
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [f"{condition} : {count}" for condition, count in ranked]
+
+
+# === Engine ===
+def scan_rows(conn, aggregates, after_rowid=0, upto_rowid=None, chunk_size=5000):
+    """Feed cleaned_weather rows with after_rowid < rowid <= upto_rowid to every aggregate."""
+    cursor = conn.execute('''
+        SELECT city, temperature, condition FROM cleaned_weather
+        WHERE rowid > ? AND rowid <= ?
+    ''', (after_rowid, upto_rowid if upto_rowid is not None else 2 ** 63 - 1))
+
+    rows = 0
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            break
+        rows += len(chunk)
+        for aggregate in aggregates:
+            add = aggregate.add
+            for city, temperature, condition in chunk:
+                add(city, temperature, condition)
+    return rows
+
+
+def build_report(db_path, thresholds, extra_aggregates=(), chunk_size=5000):
+    """Run every aggregate over cleaned_weather in a single streaming pass.
+
+    Returns (row_count, aggregates) with the built-in bucket counts and
+    extremes first, followed by extra_aggregates.
+    """
+    aggregates = [BucketCounts(thresholds), Extremes(), *extra_aggregates]
+    with get_database(db_path).connection() as conn:
+        rows = scan_rows(conn, aggregates, chunk_size=chunk_size)
+    return rows, aggregates
+
+
+def render_report(rows, aggregates):
+    report = [
+        "Weather Summary Report",
+        "-------------------------"
+    ]
+    if not rows:
+        report.append("No data available to generate report.")
+        return "\n".join(report)
+
+    for aggregate in aggregates:
+        report.extend(aggregate.lines())
+    return "\n".join(report)
+
+
+# === Report cache ===
+# A report is keyed by its aggregate setup (thresholds, percentiles, ...) and
+# stamped with a data version: cleaned_weather's max rowid plus the latest
+# cleaning_log run, both single index lookups. The pipeline only appends to
+# cleaned_weather; rows deleted below the max rowid are not noticed, so pass
+# use_cache=False after editing the table by hand.
+# Aggregate state is stored as JSON (plain counts, extremes and histograms), so
+# report_cache holds data only and a tampered row can at worst force a rescan.
+class CachedReport:
+    def __init__(self, version, rows, state, text, path=None):
+        self.version = version  # (last_rowid, last_run_id)
+        self.rows = rows
+        self.state = state      # JSON list of aggregate states after `rows` rows
+        self.text = text
+        self.path = path
+
+
+_memory = {}
+_memory_lock = threading.Lock()
+
+
+def cacheable(aggregates):
+    return all(hasattr(aggregate, name) for aggregate in aggregates for name in ("config", "state", "load_state"))
+
+
+def cache_key(aggregates):
+    """Hash of the aggregate classes and their configuration, or None if one cannot be cached."""
+    if not cacheable(aggregates):
+        return None
+    setup = [[type(aggregate).__name__, aggregate.config()] for aggregate in aggregates]
+    canonical = json.dumps(setup, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def dump_state(aggregates):
+    return json.dumps([aggregate.state() for aggregate in aggregates], separators=(",", ":"))
+
+
+def data_version(conn):
+    last_rowid = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM cleaned_weather').fetchone()[0]
+    last_run_id = conn.execute('SELECT COALESCE(MAX(run_id), 0) FROM cleaning_log').fetchone()[0]
+    return last_rowid, last_run_id
+
+
+def _load_cached(conn, key):
+    row = conn.execute('''
+        SELECT last_rowid, last_run_id, rows, state, report_text, report_path
+        FROM report_cache WHERE cache_key = ?
+    ''', (key,)).fetchone()
+    if row is None:
+        return None
+    last_rowid, last_run_id, rows, state, text, path = row
+    return CachedReport((last_rowid, last_run_id), rows, state, text, path)
+
+
+def _save_cached(conn, key, cached):
+    conn.execute('''
+        INSERT INTO report_cache
+            (cache_key, last_rowid, last_run_id, rows, state, report_text, report_path, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(cache_key) DO UPDATE SET
+            last_rowid = excluded.last_rowid,
+            last_run_id = excluded.last_run_id,
+            rows = excluded.rows,
+            state = excluded.state,
+            report_text = excluded.report_text,
+            report_path = excluded.report_path,
+            updated_at = excluded.updated_at
+    ''', (key, *cached.version, cached.rows, cached.state, cached.text, cached.path,
+          datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit()
+
+
+def _restore(previous, version, aggregates):
+    """Copies of aggregates loaded with the stored state, or None to rescan from scratch."""
+    # Stored aggregates can be continued only if rows were appended, not removed
+    if previous is None or previous.version[0] > version[0] or previous.version[1] > version[1]:
+        return None
+    try:
+        states = json.loads(previous.state)
+        if not isinstance(states, list) or len(states) != len(aggregates):
+            return None
+        restored = [copy.copy(aggregate) for aggregate in aggregates]
+        for aggregate, state in zip(restored, states):
+            aggregate.load_state(state)
+        return restored
+    except (ValueError, TypeError, KeyError, AttributeError):
+        # Written by an older layout (or not by this code at all)
+        return None
+
+
+def cached_report(db_path, thresholds, extra_aggregates=(), chunk_size=5000):
+    """Return (cache_key, CachedReport) for the current data.
+
+    Unchanged data is answered from memory (or from report_cache after a
+    restart) without reading cleaned_weather. Otherwise the stored aggregates
+    are restored and only rows added since are scanned. The key is None when
+    an extra aggregate has no JSON state; that report is always built in full.
+    """
+    aggregates = [BucketCounts(thresholds), Extremes(), *extra_aggregates]
+    key = cache_key(aggregates)
+    if key is None:
+        rows, aggregates = build_report(db_path, thresholds, extra_aggregates, chunk_size)
+        metrics.inc("report_cache_total", result="uncacheable")
+        with get_database(db_path).connection() as conn:
+            version = data_version(conn)
+        return None, CachedReport(version, rows, None, render_report(rows, aggregates))
+    memory_key = (os.path.abspath(db_path), key)
+
+    with get_database(db_path).connection() as conn:
+        version = data_version(conn)
+        with _memory_lock:
+            previous = _memory.get(memory_key)
+        if previous is None:
+            previous = _load_cached(conn, key)
+
+        if previous is not None and previous.version == version:
+            result = "hit"
+            cached = previous
+        else:
+            restored = _restore(previous, version, aggregates)
+            if restored is not None:
+                result, aggregates = "incremental", restored
+                rows = previous.rows + scan_rows(conn, aggregates, previous.version[0], version[0], chunk_size)
+            else:
+                result = "full"
+                rows = scan_rows(conn, aggregates, 0, version[0], chunk_size)
+
+            text = render_report(rows, aggregates)
+            # Same output as last time (e.g. a cleaning run that kept nothing): keep the old file
+            path = previous.path if previous is not None and previous.text == text else None
+            cached = CachedReport(version, rows, dump_state(aggregates), text, path)
+            _save_cached(conn, key, cached)
+
+    metrics.inc("report_cache_total", result=result)
+    with _memory_lock:
+        _memory[memory_key] = cached
+    return key, cached
+
+
+def write_report(rows, report_text, output_folder):
+    print(report_text)
+
+    if not rows:
+        return None
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    report_path = os.path.join(output_folder, f"weather_report_{timestamp}.txt")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(report_text)
+
+    print(f"\nReport saved to {report_path}")
+    return report_path
+
+
+def in_folder(path, folder):
+    return os.path.dirname(os.path.abspath(path)) == os.path.abspath(folder)
+
+
+def generate_weather_report(thresholds, output_folder="reports", db_path='weather.db', extra_aggregates=(),
+                            use_cache=True):
+    os.makedirs(output_folder, exist_ok=True)
+
+    if not use_cache:
+        rows, aggregates = build_report(db_path, thresholds, extra_aggregates)
+        return write_report(rows, render_report(rows, aggregates), output_folder)
+
+    key, cached = cached_report(db_path, thresholds, extra_aggregates)
+    if cached.path and os.path.exists(cached.path) and in_folder(cached.path, output_folder):
+        print(cached.text)
+        print(f"\nData unchanged since {cached.path}, no new report written")
+        return cached.path
+
+    # New data, or the last copy lives in another folder: write one here
+    cached.path = write_report(cached.rows, cached.text, output_folder)
+    if key is not None:
+        with get_database(db_path).connection() as conn:
+            _save_cached(conn, key, cached)
+    return cached.path
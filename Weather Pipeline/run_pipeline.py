@@ -0,0 +1,79 @@
+"""Portable entry point for the cleaning + report pipeline (replaces run_pipeline.bat).
+
+    python run_pipeline.py                  # one run, output appended to pipeline_log.txt
+    python run_pipeline.py --every 60       # run every 60 minutes until Ctrl+C / SIGTERM
+    python run_pipeline.py --profile --metrics-file metrics.prom
+"""
+import os
+import sys
+
+# Shared modules (db, db_schema, scheduler, ...) live in the repository root
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import argparse
+import logging
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+
+import metrics
+from scheduler import Scheduler
+
+
+def run_once(log_path, profile=False, trace_memory=False, metrics_file=None):
+    # Imported here so --help stays fast and a broken pipeline module is logged, not fatal
+    with open(log_path, "a", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        print(f"=== Pipeline Run: {datetime.now():%Y-%m-%d %H:%M:%S} ===")
+        try:
+            import main
+            main.run(profile=profile, trace_memory=trace_memory)
+        except Exception:
+            traceback.print_exc()
+            raise
+        finally:
+            print()
+            if metrics_file:
+                metrics.write_prometheus(metrics_file)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the weather cleaning and report pipeline.")
+    parser.add_argument("--every", type=float, metavar="MINUTES",
+                        help="keep running on this interval instead of running once")
+    parser.add_argument("--log", default=os.path.join(HERE, "pipeline_log.txt"),
+                        help="file that pipeline output is appended to")
+    parser.add_argument("--profile", action="store_true",
+                        help="save a cProfile dump of each run under profiles/")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record the tracemalloc peak of each run")
+    parser.add_argument("--metrics-file",
+                        help="write Prometheus metrics here after each run (textfile collector)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Relative paths in config.json (db_path, output_folder) are relative to this folder
+    os.chdir(HERE)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    def run():
+        run_once(args.log, args.profile, args.trace_memory, args.metrics_file)
+
+    if not args.every:
+        try:
+            run()
+        except Exception:
+            return 1
+        return 0
+
+    scheduler = Scheduler(max_workers=1)
+    scheduler.every(args.every * 60, run, name="pipeline", run_now=True)
+    scheduler.run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
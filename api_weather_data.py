@@ -1,5 +1,6 @@
 import requests
-import sqlite3
+import db_schema
+from wttr_parser import parse_weather_payload
 from datetime import datetime
 
 # === Fetch weather data from wttr.in ===
@@ -7,7 +8,7 @@ city = "London"
 url = f"https://wttr.in/{city}?format=j1"
 
 response = requests.get(url)
-data = response.json()
+data = parse_weather_payload(response.content)
 
 # Extract current weather data
 current = data['current_condition'][0]
@@ -22,19 +23,10 @@ print(f"Temperature: {temp}°C")
 print(f"Humidity: {current['humidity']}%")
 
 # === Save to SQLite ===
-conn = sqlite3.connect('weather.db')
+# db_schema creates/migrates the tables on connect
+conn = db_schema.connect('weather.db')
 cursor = conn.cursor()
 
-# Create the table if not exists
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS weather (
-    city TEXT,
-    date TEXT,
-    state TEXT,
-    temp REAL
-)
-''')
-
 # Insert current weather data
 cursor.execute('''
 INSERT INTO weather (city, date, state, temp)
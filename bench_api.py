@@ -0,0 +1,109 @@
+"""Load test for weather_api while a writer keeps ingesting.
+
+    python bench_api.py --rows 200000 --clients 16 --seconds 10
+
+Builds a synthetic database in a temp directory, serves it on a local port
+with a WeatherWriter feeding the LatestCache, and reports throughput, latency
+percentiles and how many requests actually reached the database.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from db import get_database
+from synthetic_data import CITIES, weather_readings
+from weather_api import LatestCache, ReadService, start_api_server
+from weather_writer import WeatherWriter
+
+
+def build_database(path, rows):
+    database = get_database(path)
+    readings = list(weather_readings(rows))
+    latest = {}
+    for city, date, _, _ in readings:
+        latest[city] = max(date, latest.get(city, date))
+    with database.transaction() as conn:
+        conn.executemany('INSERT INTO weather (city, date, state, temp) VALUES (?, ?, ?, ?)', readings)
+        conn.executemany('INSERT INTO last_updated (city, last_fetch) VALUES (?, ?)', latest.items())
+
+
+def ingest(writer, stop, per_second):
+    # Stand-in for the fetch loop: a steady trickle of new readings
+    rng = random.Random(1)
+    while not stop.is_set():
+        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        writer.add(rng.choice(CITIES), date, "Sunny", round(rng.uniform(20, 35), 1))
+        time.sleep(1 / per_second)
+
+
+def client(base, paths, stop, latencies, statuses):
+    session = requests.Session()
+    rng = random.Random()
+    etag = None
+    while not stop.is_set():
+        path = rng.choice(paths)
+        headers = {"If-None-Match": etag} if path == "/latest" and etag else {}
+        start = time.perf_counter()
+        response = session.get(base + path, headers=headers)
+        latencies.setdefault(path.split("/")[1].split("?")[0], []).append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if path == "/latest":
+            etag = response.headers.get("ETag")
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else values[0] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writes-per-second", type=float, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_api.db")
+    build_database(path, args.rows)
+
+    cache = LatestCache()
+    writer = WeatherWriter(path, batch_size=100, flush_interval=1.0)
+    writer.listeners.append(cache.update)
+    service = ReadService(path, cache=cache)
+    server = start_api_server(service, port=0, host="127.0.0.1")
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Dashboards mostly poll /latest; history and daily are the occasional drill-down
+    paths = (["/latest"] * 6 + [f"/latest/{city}" for city in CITIES[:3]] +
+             [f"/history/{CITIES[0]}?hours=24", f"/daily?days=30", f"/daily/{CITIES[1]}?days=30"])
+
+    stop = threading.Event()
+    latencies, statuses = {}, {}
+    threads = [threading.Thread(target=ingest, args=(writer, stop, args.writes_per_second))]
+    threads += [threading.Thread(target=client, args=(base, paths, stop, latencies, statuses))
+                for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    writer.close()
+    server.shutdown()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} requests in {args.seconds:.0f}s ({total / args.seconds:,.0f} req/s), "
+          f"{args.clients} clients, {writer.rows_written} rows ingested meanwhile")
+    print(f"{'endpoint':<10} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, values in sorted(latencies.items()):
+        print(f"{endpoint:<10} {len(values):>9} {percentile(values, 50):>8.2f} "
+              f"{percentile(values, 95):>8.2f} {percentile(values, 99):>8.2f}")
+    print(f"status codes: {statuses}")
+    print(f"database queries: {service.db_queries} ({service.db_queries / max(total, 1):.2%} of requests)")
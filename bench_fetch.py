@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from weather_fetcher import fetch_all, make_session
+
+# === Stub wttr.in server ===
+DELAY = 0.2
+NUM_CITIES = 50
+
+PAYLOAD = json.dumps({
+    "current_condition": [{
+        "temp_C": "24",
+        "humidity": "60",
+        "weatherDesc": [{"value": "Sunny"}]
+    }]
+}).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def start_stub_server():
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# === Benchmarks ===
+def run_serial(cities, url_template):
+    for city in cities:
+        response = requests.get(url_template.format(city=city), timeout=10)
+        response.raise_for_status()
+        response.json()
+
+
+def run_concurrent(cities, url_template, max_workers):
+    results = fetch_all(cities, max_workers=max_workers, rate_per_host=0,
+                        url_template=url_template, session=make_session(max_workers))
+    failed = [city for city, _, error in results if error]
+    if failed:
+        raise RuntimeError(f"{len(failed)} fetches failed")
+
+
+if __name__ == "__main__":
+    server = start_stub_server()
+    host, port = server.server_address
+    url_template = f"http://{host}:{port}/{{city}}?format=j1"
+    cities = [f"City{i}" for i in range(NUM_CITIES)]
+
+    print(f"{NUM_CITIES} cities, {DELAY:.2f}s stub latency per request\n")
+
+    start = time.perf_counter()
+    run_serial(cities, url_template)
+    serial_time = time.perf_counter() - start
+    print(f"Serial requests.get     : {serial_time:.3f} seconds")
+
+    for workers in (4, 16, 64):
+        start = time.perf_counter()
+        run_concurrent(cities, url_template, workers)
+        elapsed = time.perf_counter() - start
+        print(f"fetch_all workers={workers:<3}  : {elapsed:.3f} seconds ({serial_time / elapsed:.1f}x)")
+
+    server.shutdown()
@@ -0,0 +1,80 @@
+import json
+import random
+import time
+import tracemalloc
+
+from wttr_parser import extract_current_condition, full_loads
+
+# === Synthetic j1 payloads ===
+# Same layout as wttr.in ?format=j1: current_condition first, then area,
+# request and three days of 3-hourly forecasts that the pipelines never read.
+NUM_PAYLOADS = 200
+HOURLY_FIELDS = ["DewPointC", "DewPointF", "FeelsLikeC", "FeelsLikeF", "HeatIndexC", "HeatIndexF",
+                 "WindChillC", "WindChillF", "WindGustKmph", "WindGustMiles", "chanceoffog",
+                 "chanceoffrost", "chanceofhightemp", "chanceofovercast", "chanceofrain",
+                 "chanceofremdry", "chanceofsnow", "chanceofsunshine", "chanceofthunder",
+                 "chanceofwindy", "cloudcover", "diffRad", "humidity", "precipInches", "precipMM",
+                 "pressure", "pressureInches", "shortRad", "tempC", "tempF", "time", "uvIndex",
+                 "visibility", "visibilityMiles", "weatherCode", "winddir16Point", "winddirDegree",
+                 "windspeedKmph", "windspeedMiles"]
+
+
+def make_payload(rng):
+    current = {
+        "FeelsLikeC": str(rng.randint(-5, 40)), "cloudcover": str(rng.randint(0, 100)),
+        "humidity": str(rng.randint(10, 100)), "localObsDateTime": "2025-05-09 10:00 AM",
+        "observation_time": "04:30 AM", "precipMM": "0.0", "pressure": "1012",
+        "temp_C": str(rng.randint(-5, 40)), "temp_F": "75", "uvIndex": "5", "visibility": "10",
+        "weatherCode": "113", "weatherDesc": [{"value": rng.choice(["Sunny", "Cloudy", "Light rain"])}],
+        "weatherIconUrl": [{"value": ""}], "winddir16Point": "NW", "winddirDegree": "310",
+        "windspeedKmph": "11", "windspeedMiles": "7"
+    }
+    days = []
+    for day in range(3):
+        hourly = [{**{field: str(rng.randint(0, 100)) for field in HOURLY_FIELDS},
+                   "weatherDesc": [{"value": "Partly cloudy"}], "weatherIconUrl": [{"value": ""}]}
+                  for _ in range(8)]
+        days.append({"astronomy": [{"moon_illumination": "50", "moon_phase": "Waxing", "moonrise": "01:00 PM",
+                                    "moonset": "02:00 AM", "sunrise": "05:30 AM", "sunset": "08:30 PM"}],
+                     "avgtempC": "20", "avgtempF": "68", "date": f"2025-05-{9 + day:02d}", "hourly": hourly,
+                     "maxtempC": "25", "maxtempF": "77", "mintempC": "15", "mintempF": "59",
+                     "sunHour": "10.5", "totalSnow_cm": "0.0", "uvIndex": "5"})
+    payload = {
+        "current_condition": [current],
+        "nearest_area": [{"areaName": [{"value": "London"}], "country": [{"value": "United Kingdom"}],
+                          "latitude": "51.517", "longitude": "-0.106", "population": "7556900"}],
+        "request": [{"query": "London, United Kingdom", "type": "City"}],
+        "weather": days
+    }
+    return json.dumps(payload, indent=4).encode("utf-8")
+
+
+def measure(name, parse, payloads):
+    # CPU time over all payloads, then peak traced allocation for a single parse
+    start = time.process_time()
+    for body in payloads:
+        parse(body)
+    cpu = (time.process_time() - start) / len(payloads)
+
+    tracemalloc.start()
+    parse(payloads[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<28}: {cpu * 1e6:8.1f} us CPU/fetch | peak alloc {peak / 1024:7.1f} KiB")
+    return cpu
+
+
+if __name__ == "__main__":
+    rng = random.Random(7)
+    payloads = [make_payload(rng) for _ in range(NUM_PAYLOADS)]
+    print(f"{NUM_PAYLOADS} payloads, {len(payloads[0]) / 1024:.1f} KiB each\n")
+
+    for body in payloads:
+        assert extract_current_condition(body) == json.loads(body)["current_condition"]
+
+    baseline = measure("json.loads (full)", json.loads, payloads)
+    if full_loads is not json.loads:
+        measure("orjson.loads (full)", full_loads, payloads)
+    fast = measure("extract_current_condition", extract_current_condition, payloads)
+    print(f"\nextract vs json.loads: {baseline / fast:.1f}x less CPU")
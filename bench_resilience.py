@@ -0,0 +1,52 @@
+import time
+
+from fault_server import FaultServer
+from resilience import HostBreakers, RetryPolicy
+from weather_fetcher import fetch_all, make_session
+
+# === Scenarios against a local fault-injecting server ===
+NUM_CITIES = 60
+# Stand-in for the old flat 10s timeout, shortened so the benchmark stays quick
+LEGACY_TIMEOUT = 2.0
+
+
+def legacy(url_template):
+    # No retries, no breaker, one timeout for connect + read
+    return dict(url_template=url_template, timeout=LEGACY_TIMEOUT, retry=RetryPolicy(attempts=1),
+                breakers=HostBreakers(failure_threshold=10 ** 9), session=make_session(16))
+
+
+def resilient(url_template, deadline=5):
+    return dict(url_template=url_template, timeout=(0.5, 1.0), retry=RetryPolicy(attempts=3, base=0.05, cap=0.5),
+                breakers=HostBreakers(failure_threshold=5, reset_timeout=30), deadline=deadline,
+                session=make_session(16))
+
+
+def run(name, server, options):
+    cities = [f"City{i}" for i in range(NUM_CITIES)]
+    server.requests = 0
+    start = time.perf_counter()
+    results = fetch_all(cities, rate_per_host=0, **options)
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for _, data, error in results if error is None)
+    print(f"  {name:<10} {elapsed:>7.2f}s total, {elapsed / NUM_CITIES * 1000:>8.1f} ms/city, "
+          f"{ok:>3}/{NUM_CITIES} ok, {server.requests:>3} upstream requests")
+
+
+if __name__ == "__main__":
+    server = FaultServer().start()
+
+    scenarios = [
+        ("healthy", "ok", {}),
+        ("slow upstream (3s responses)", "slow", {"delay": 3.0}),
+        ("upstream returning 503", "error", {}),
+        ("connection dropped", "drop", {}),
+        ("flaky (30% 503)", "flaky", {"failure_rate": 0.3})
+    ]
+    for title, mode, options in scenarios:
+        server.set_mode(mode, **options)
+        print(title)
+        run("legacy", server, legacy(server.url_template))
+        run("resilient", server, resilient(server.url_template))
+
+    server.shutdown()
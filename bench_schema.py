@@ -0,0 +1,117 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import db_schema
+
+# === Synthetic data ===
+NUM_ROWS = 500_000
+CITIES = [f"City{i}" for i in range(200)]
+CONDITIONS = ["Sunny", "Cloudy", "Rainy", "Clear", "Hazy", "Windy"]
+
+# name -> (query on the legacy schema, same query written for the migrated schema)
+# Each one is a query the pipelines or the read API actually run
+QUERIES = {
+    "daily summary": (
+        """
+        SELECT city, DATE(date), AVG(temp), MIN(temp), MAX(temp)
+        FROM weather
+        GROUP BY city, DATE(date)
+        """,
+        """
+        SELECT city, day, AVG(temp), MIN(temp), MAX(temp)
+        FROM weather
+        GROUP BY city, day
+        """
+    ),
+    "one city, one week": (
+        """
+        SELECT date, temp FROM weather
+        WHERE city = 'City7' AND date >= '2025-03-01' AND date < '2025-03-08'
+        """,
+    ),
+    "incremental daily rollup": (
+        """
+        SELECT city, DATE(date), SUM(temp), COUNT(*), MIN(temp), MAX(temp)
+        FROM weather
+        WHERE rowid > 490000 AND rowid <= 500000
+        GROUP BY city, DATE(date)
+        """,
+        """
+        SELECT city, day, SUM(temp), COUNT(*), MIN(temp), MAX(temp)
+        FROM weather
+        WHERE rowid > 490000 AND rowid <= 500000
+        GROUP BY city, day
+        """
+    ),
+    "api latest for a city": ("SELECT city, date, state, temp FROM weather WHERE city = 'City7' "
+                              "ORDER BY date DESC LIMIT 1",),
+    "retention batch": ("SELECT rowid FROM weather WHERE date < '2025-01-15' LIMIT 5000",)
+}
+
+
+def generate_rows(seed=42):
+    rng = random.Random(seed)
+    start = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1))
+    for _ in range(NUM_ROWS):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + rng.randrange(0, 180 * 86400)))
+        yield rng.choice(CITIES), stamp, rng.choice(CONDITIONS), round(rng.uniform(-10, 45), 1)
+
+
+def load(conn):
+    # Returns the insert time, which is what every extra index costs
+    rows = list(generate_rows())
+    start = time.perf_counter()
+    conn.executemany('INSERT INTO weather (city, date, state, temp) VALUES (?, ?, ?, ?)', rows)
+    conn.executemany('INSERT INTO cleaned_weather (city, temperature, condition) VALUES (?, ?, ?)',
+                     [(city, temp, condition) for city, _, condition, temp in rows])
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def time_query(conn, sql, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def plan(conn, sql):
+    return "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix="bench_schema_")
+    legacy_path = os.path.join(folder, "legacy.db")
+    tuned_path = os.path.join(folder, "tuned.db")
+
+    # Legacy: the original CREATE TABLE statements only, default pragmas
+    legacy = sqlite3.connect(legacy_path)
+    for statement in db_schema.MIGRATIONS[0][2]:
+        legacy.execute(statement)
+    legacy_load = load(legacy)
+
+    tuned = db_schema.connect(tuned_path)
+    tuned_load = load(tuned)
+    tuned.execute("ANALYZE")
+
+    print(f"{NUM_ROWS} readings, {len(CITIES)} cities")
+    print(f"insert: legacy {legacy_load:.2f} s -> tuned {tuned_load:.2f} s\n")
+    for name, queries in QUERIES.items():
+        legacy_sql, tuned_sql = queries[0], queries[-1]
+        legacy_time, tuned_time = time_query(legacy, legacy_sql), time_query(tuned, tuned_sql)
+
+        print(name)
+        print(f"  legacy : {plan(legacy, legacy_sql)}")
+        print(f"  tuned  : {plan(tuned, tuned_sql)}")
+        print(f"  latency: legacy {legacy_time * 1000:.1f} ms -> tuned {tuned_time * 1000:.2f} ms "
+              f"({legacy_time / tuned_time:.1f}x)\n")
+
+    legacy.close()
+    tuned.close()
+    shutil.rmtree(folder)
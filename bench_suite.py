@@ -0,0 +1,223 @@
+"""Stage benchmarks on seeded synthetic data, offline against a temporary SQLite file.
+
+    python bench_suite.py --rows 1000000 --threads 1,2,4,8 --batch-sizes 5000,50000
+    python bench_suite.py --save-baseline          # store this machine's numbers
+    python bench_suite.py --tolerance 0.15         # exit 1 if a case got >15% slower
+
+Results are written as JSON (--output) and compared case by case with the
+baseline file when it exists.
+"""
+import os
+import sys
+
+# The cleaning and report stages live in the Weather Pipeline folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Weather Pipeline"))
+
+import argparse
+import itertools
+import json
+import platform
+import shutil
+import tempfile
+from datetime import datetime
+
+import daily_summary
+import weather_export
+from cleaning_engine import run_cleaning
+from db import get_database
+from metrics import span
+from report_engine import build_report
+from synthetic_data import messy_records, weather_readings
+
+STAGES = ["clean", "report", "summary", "export"]
+THRESHOLDS = {"hot": 30, "warm": 20}
+LOAD_BATCH = 100_000
+
+
+# === Data loading ===
+def load_weather(db_path, rows, seed):
+    # Streamed in batches so the raw table can be far larger than memory
+    database = get_database(db_path)
+    readings = weather_readings(rows, seed)
+    with database.transaction() as conn:
+        while True:
+            batch = list(itertools.islice(readings, LOAD_BATCH))
+            if not batch:
+                break
+            conn.executemany('INSERT INTO weather (city, date, state, temp) VALUES (?, ?, ?, ?)', batch)
+
+
+def reset(db_path, *tables):
+    with get_database(db_path).transaction() as conn:
+        for table in tables:
+            conn.execute(f"DELETE FROM {table}")
+
+
+# === Stages ===
+def bench_clean(db_path, records, threads, batch_sizes):
+    cases = [("rows", workers, batch) for workers in threads for batch in batch_sizes]
+    cases += [("columnar", 1, batch) for batch in batch_sizes]
+    for mode, workers, batch in cases:
+        reset(db_path, "cleaned_weather")
+        with span("bench_clean") as stage:
+            stats = run_cleaning(records, db_path, workers=workers, chunk_size=batch, mode=mode)
+        yield {"mode": mode, "threads": workers, "batch_size": batch}, len(records), stage.seconds, stats["cleaned"]
+
+
+def bench_report(db_path, batch_sizes):
+    for batch in batch_sizes:
+        with span("bench_report") as stage:
+            rows, _ = build_report(db_path, THRESHOLDS, chunk_size=batch)
+        yield {"batch_size": batch}, rows, stage.seconds, rows
+
+
+def bench_summary(db_path, rows, seed):
+    # Full build from an empty summary, then an incremental run over 1% new readings
+    reset(db_path, "daily_summary_new", "daily_summary_state", "summary_watermark")
+    with span("bench_summary") as stage:
+        processed = daily_summary.update_daily_summary(db_path)
+    yield {"run": "full"}, rows, stage.seconds, processed
+
+    extra = max(1, rows // 100)
+    load_weather(db_path, extra, seed + 1)
+    with span("bench_summary") as stage:
+        processed = daily_summary.update_daily_summary(db_path)
+    yield {"run": "incremental"}, extra, stage.seconds, processed
+
+
+def bench_export(db_path, folder, batch_sizes):
+    for compression, batch in itertools.product((None, "gzip"), batch_sizes):
+        filename = os.path.join(folder, "export.csv")
+        with span("bench_export") as stage:
+            path, written = weather_export.export_weather_to_csv(
+                db_path, filename, compression=compression, chunk_size=batch)
+        os.remove(path)
+        yield {"compression": compression or "none", "batch_size": batch}, written, stage.seconds, written
+
+
+# === Runner ===
+def run_suite(rows, seed, stages, threads, batch_sizes, folder):
+    db_path = os.path.join(folder, "bench.db")
+    results = []
+
+    def record(stage, cases):
+        for params, processed, seconds, output in cases:
+            result = {
+                "stage": stage,
+                "params": params,
+                "rows": processed,
+                "output_rows": output,
+                "seconds": round(seconds, 6),
+                "rows_per_sec": round(processed / seconds) if seconds else None
+            }
+            results.append(result)
+            print(f"{stage:<8} {format_params(params):<40} {seconds:>9.3f}s {result['rows_per_sec'] or 0:>12,} rows/s")
+
+    if {"clean", "report"} & set(stages):
+        records = list(messy_records(rows, seed))
+        if "clean" in stages:
+            record("clean", bench_clean(db_path, records, threads, batch_sizes))
+        if "report" in stages:
+            if "clean" not in stages:
+                run_cleaning(records, db_path)
+            record("report", bench_report(db_path, batch_sizes))
+        del records
+
+    if {"summary", "export"} & set(stages):
+        load_weather(db_path, rows, seed)
+        if "export" in stages:
+            record("export", bench_export(db_path, folder, batch_sizes))
+        if "summary" in stages:
+            record("summary", bench_summary(db_path, rows, seed))
+
+    get_database(db_path).close()
+    return results
+
+
+def format_params(params):
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def case_key(result):
+    return result["stage"], format_params(result["params"]), result["rows"]
+
+
+# === Baseline comparison ===
+def compare(results, baseline, tolerance):
+    """Return the cases that are more than tolerance slower than the baseline."""
+    previous = {case_key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['created']} (tolerance {tolerance:.0%}):")
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        change = result["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        flag = "REGRESSION" if change > tolerance else ""
+        print(f"  {result['stage']:<8} {format_params(result['params']):<40} "
+              f"{old['seconds']:>9.3f}s -> {result['seconds']:>9.3f}s ({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic weather data.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma separated subset of {STAGES}")
+    parser.add_argument("--threads", default=f"1,{os.cpu_count() or 1}", help="worker counts for the clean stage")
+    parser.add_argument("--batch-sizes", default="5000,50000")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default="bench_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {sorted(unknown)}")
+
+    threads = sorted({int(value) for value in args.threads.split(",")})
+    batch_sizes = [int(value) for value in args.batch_sizes.split(",")]
+
+    folder = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        results = run_suite(args.rows, args.seed, stages, threads, batch_sizes, folder)
+    finally:
+        shutil.rmtree(folder)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "rows": args.rows,
+        "seed": args.seed,
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
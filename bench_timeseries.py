@@ -0,0 +1,91 @@
+"""Memory and window-query cost: TimeSeriesStore vs dict rows vs SQLite.
+
+    python bench_timeseries.py --cities 500 --per-city 1440
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_data import CONDITIONS
+from timeseries_store import TimeSeriesStore
+
+
+def readings(cities, per_city):
+    start = 1_735_689_600
+    for i in range(per_city):
+        for c in range(cities):
+            yield f"City{c}", start + i * 60, 15 + (i * 7 + c) % 20 + 0.5, 40 + (i + c) % 50, CONDITIONS[(i + c) % len(CONDITIONS)]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--per-city", type=int, default=1440)
+    parser.add_argument("--window", type=int, default=60)
+    args = parser.parse_args()
+    total = args.cities * args.per_city
+
+    def build_dicts():
+        rows = {}
+        for city, ts, temp, humidity, condition in readings(args.cities, args.per_city):
+            rows.setdefault(city, []).append({"city": city, "timestamp": ts, "temp": temp,
+                                              "humidity": str(humidity), "condition": condition})
+        return rows
+
+    def build_store():
+        store = TimeSeriesStore(capacity=args.per_city, initial_cities=args.cities)
+        for row in readings(args.cities, args.per_city):
+            store.append(*row)
+        return store
+
+    rows, dict_bytes, dict_seconds = measure(build_dicts)
+    print(f"{'list of dicts':<16} {dict_bytes / total:>8.1f} bytes/reading, built in {dict_seconds:.2f}s")
+    del rows
+    store, store_bytes, store_seconds = measure(build_store)
+    print(f"{'TimeSeriesStore':<16} {store_bytes / total:>8.1f} bytes/reading, built in {store_seconds:.2f}s")
+    # tracemalloc slows both builds down; time appends again untraced
+    start = time.perf_counter()
+    build_store()
+    print(f"{'':<16} {(time.perf_counter() - start) / total * 1e6:>8.1f} us/append untraced")
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_timeseries.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE weather (city TEXT, ts INTEGER, temp REAL, humidity INTEGER, state TEXT)")
+    conn.execute("CREATE INDEX idx_city_ts ON weather (city, ts)")
+    conn.executemany("INSERT INTO weather VALUES (?, ?, ?, ?, ?)", readings(args.cities, args.per_city))
+    conn.commit()
+
+    start = time.perf_counter()
+    for c in range(args.cities):
+        conn.execute('''
+            SELECT AVG(temp), MIN(temp), MAX(temp) FROM (
+                SELECT temp FROM weather WHERE city = ? ORDER BY ts DESC LIMIT ?
+            )
+        ''', (f"City{c}", args.window)).fetchone()
+    sql_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.windows(args.window)
+    store_window_seconds = time.perf_counter() - start
+    print(f"last-{args.window} avg/min/max for {args.cities} cities: SQLite {sql_seconds * 1000:.1f} ms, "
+          f"store {store_window_seconds * 1000:.1f} ms")
+
+    snapshot = path.replace(".db", ".npz")
+    start = time.perf_counter()
+    store.snapshot(snapshot)
+    TimeSeriesStore.restore(snapshot)
+    print(f"snapshot + restore {time.perf_counter() - start:.2f}s, {os.path.getsize(snapshot) / 1e6:.1f} MB on disk")
+    conn.close()
@@ -0,0 +1,71 @@
+from db import get_database
+
+# Running aggregates per (city, day) live in daily_summary_state; daily_summary_new
+# is derived from them. Tables are created by db_schema.
+MERGE_NEW_READINGS = '''
+    INSERT INTO daily_summary_state (city, date, sum_temp, count, min_temp, max_temp)
+    SELECT city, day, SUM(temp), COUNT(*), MIN(temp), MAX(temp)
+    FROM weather
+    WHERE rowid > ? AND rowid <= ?
+    GROUP BY city, day
+    ON CONFLICT(city, date) DO UPDATE SET
+        sum_temp = sum_temp + excluded.sum_temp,
+        count = count + excluded.count,
+        min_temp = MIN(min_temp, excluded.min_temp),
+        max_temp = MAX(max_temp, excluded.max_temp)
+'''
+
+# Only (city, day) groups touched by this batch are rewritten
+REFRESH_SUMMARY = '''
+    INSERT INTO daily_summary_new (city, date, avg_temp, min_temp, max_temp, category)
+    SELECT s.city, s.date, s.sum_temp / s.count, s.min_temp, s.max_temp,
+           CASE
+               WHEN s.sum_temp / s.count >= 30 THEN 'Hot'
+               WHEN s.sum_temp / s.count >= 20 THEN 'Warm'
+               ELSE 'Cool'
+           END
+    FROM daily_summary_state s
+    WHERE (s.city, s.date) IN (
+        SELECT DISTINCT city, day FROM weather WHERE rowid > ? AND rowid <= ?
+    )
+    ON CONFLICT(city, date) DO UPDATE SET
+        avg_temp = excluded.avg_temp,
+        min_temp = excluded.min_temp,
+        max_temp = excluded.max_temp,
+        category = excluded.category
+'''
+
+
+def update_daily_summary_incremental(conn, name='daily_summary'):
+    """Fold weather rows added since the last run into the daily summary.
+
+    Progress is tracked by weather rowid rather than by reading date, so rows
+    that arrive late for an earlier day are still picked up exactly once.
+    Runs inside the caller's transaction. Returns the number of new readings processed.
+    """
+    cursor = conn.cursor()
+
+    row = cursor.execute('SELECT last_rowid FROM summary_watermark WHERE name = ?', (name,)).fetchone()
+    last_rowid = row[0] if row else 0
+    high_rowid = cursor.execute('SELECT COALESCE(MAX(rowid), 0) FROM weather').fetchone()[0]
+
+    if high_rowid <= last_rowid:
+        return 0
+
+    new_rows = cursor.execute(
+        'SELECT COUNT(*) FROM weather WHERE rowid > ? AND rowid <= ?', (last_rowid, high_rowid)
+    ).fetchone()[0]
+
+    cursor.execute(MERGE_NEW_READINGS, (last_rowid, high_rowid))
+    cursor.execute(REFRESH_SUMMARY, (last_rowid, high_rowid))
+    cursor.execute('''
+        INSERT INTO summary_watermark (name, last_rowid)
+        VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET last_rowid = excluded.last_rowid
+    ''', (name, high_rowid))
+    return new_rows
+
+
+def update_daily_summary(db_path='weather.db'):
+    with get_database(db_path).transaction() as conn:
+        return update_daily_summary_incremental(conn)
@@ -0,0 +1,242 @@
+import itertools
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import db_schema
+
+# === Pool ===
+class ConnectionPool:
+    """Thread-safe pool: connections are created lazily up to max_size and reused."""
+
+    def __init__(self, connect, max_size=8, timeout=30):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Connection pool is closed")
+            can_create = self.created < self.max_size
+            if can_create:
+                self.created += 1
+
+        if can_create:
+            try:
+                return self.connect()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+
+        try:
+            return self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection free after {self.timeout}s")
+
+    def release(self, conn):
+        if self.closed:
+            conn.close()
+            return
+        self.idle.put(conn)
+
+    def discard(self, conn):
+        # Broken connections are dropped so the pool can replace them
+        with self.lock:
+            self.created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# === Database ===
+class Database:
+    """Pooled access to one SQLite file or Postgres server.
+
+    SQL is written with ? placeholders for both backends. Statements are reused
+    per connection: SQLite through its statement cache, Postgres through
+    server-side PREPARE.
+    """
+
+    def __init__(self, target='weather.db', max_size=8, statement_cache=256):
+        self.target = target
+        self.backend = "postgres" if target.startswith(("postgres://", "postgresql://")) else "sqlite"
+        self.statement_cache = statement_cache
+        self.pool = ConnectionPool(self._connect, max_size=max_size)
+
+    def _connect(self):
+        if self.backend == "postgres":
+            import psycopg2
+            conn = psycopg2.connect(self.target, connection_factory=_postgres_connection_class())
+            conn.prepared = {}
+            return conn
+        return db_schema.connect(self.target, check_same_thread=False,
+                                 cached_statements=self.statement_cache)
+
+    @contextmanager
+    def connection(self):
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        except BaseException as e:
+            # GeneratorExit (an abandoned generator holding the connection), KeyboardInterrupt
+            # and the like may stop mid-statement: close the connection rather than reuse it
+            if not isinstance(e, Exception) or self._is_broken(conn, e):
+                self.pool.discard(conn)
+            else:
+                try:
+                    conn.rollback()
+                except Exception:
+                    self.pool.discard(conn)
+                else:
+                    self.pool.release(conn)
+            raise
+        else:
+            self.pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        # Commits on success, rolls back on any exception
+        with self.connection() as conn:
+            yield conn
+            conn.commit()
+
+    @property
+    def errors(self):
+        """Exceptions a failing query can raise on this backend, pool exhaustion included."""
+        if self.backend == "postgres":
+            import psycopg2
+            return psycopg2.Error, TimeoutError
+        return sqlite3.Error, TimeoutError
+
+    def _is_broken(self, conn, error):
+        if self.backend == "postgres":
+            return bool(getattr(conn, "closed", False))
+        return False
+
+    # === Statement helpers ===
+    def execute(self, conn, sql, params=()):
+        if self.backend == "sqlite":
+            return conn.execute(sql, params)
+        cursor = conn.cursor()
+        cursor.execute(*self._prepare(conn, sql, params))
+        return cursor
+
+    def executemany(self, conn, sql, rows):
+        if self.backend == "sqlite":
+            return conn.executemany(sql, rows)
+        cursor = conn.cursor()
+        for params in rows:
+            cursor.execute(*self._prepare(conn, sql, params))
+        return cursor
+
+    def query(self, sql, params=()):
+        with self.connection() as conn:
+            return self.execute(conn, sql, params).fetchall()
+
+    def _prepare(self, conn, sql, params):
+        name = conn.prepared.get(sql)
+        if name is None:
+            name = f"stmt_{len(conn.prepared)}"
+            with conn.cursor() as cursor:
+                cursor.execute(f"PREPARE {name} AS {to_numbered_params(sql)}")
+            conn.prepared[sql] = name
+        if not params:
+            return f"EXECUTE {name}", ()
+        return f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", tuple(params)
+
+    def close(self):
+        self.pool.close()
+
+
+_pg_connection_class = None
+
+
+def _postgres_connection_class():
+    # psycopg2's own connection type has no __dict__, so PREPAREd names need a subclass
+    global _pg_connection_class
+    if _pg_connection_class is None:
+        import psycopg2.extensions
+
+        class PreparingConnection(psycopg2.extensions.connection):
+            pass
+
+        _pg_connection_class = PreparingConnection
+    return _pg_connection_class
+
+
+def to_numbered_params(sql):
+    # ? -> $1, $2 ... outside of quoted strings
+    numbers = itertools.count(1)
+    return _replace_placeholders(sql, lambda: f"${next(numbers)}")
+
+
+def to_format_params(sql):
+    # ? -> %s for plain psycopg2 cursors; literal % has to be doubled there
+    return _replace_placeholders(sql, lambda: "%s", percent="%%")
+
+
+def _replace_placeholders(sql, placeholder, percent="%"):
+    out, quote = [], None
+    for char in sql:
+        if char == "%":
+            out.append(percent)
+            continue
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "?":
+            out.append(placeholder())
+            continue
+        out.append(char)
+    return "".join(out)
+
+
+# === Shared instances ===
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(target=None, **kwargs):
+    """One pooled Database per path/URL for the whole process.
+
+    target defaults to $WEATHER_DB, then 'weather.db'.
+    """
+    target = target or os.environ.get("WEATHER_DB", "weather.db")
+    if not target.startswith(("postgres://", "postgresql://")):
+        target = os.path.abspath(target)
+    with _databases_lock:
+        if target not in _databases:
+            _databases[target] = Database(target, **kwargs)
+        return _databases[target]
+
+
+def close_all():
+    with _databases_lock:
+        for database in _databases.values():
+            database.close()
+        _databases.clear()
@@ -1,11 +1,7 @@
-import sqlite3
+from db import get_database
 
-conn = sqlite3.connect('weather.db')
-cursor = conn.cursor()
+db = get_database('weather.db')
 
-cursor.execute('SELECT * FROM last_updated')
-rows = cursor.fetchall()
+rows = db.query('SELECT * FROM last_updated')
 for row in rows:
     print(row)
-
-conn.close()
\ No newline at end of file
@@ -0,0 +1,226 @@
+import sqlite3
+import threading
+
+# Connection settings applied to every connection opened through this module
+PRAGMAS = [
+    # Only takes effect on a new file; retention.py converts existing ones
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",      # 64 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000"
+]
+
+# === Migrations ===
+# Applied in order; PRAGMA user_version records the last one that ran.
+# Never edit a released migration, append a new one instead.
+MIGRATIONS = [
+    (1, "base tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS weather (
+            city TEXT,
+            date TEXT,
+            state TEXT,
+            temp REAL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS last_updated (
+            city TEXT PRIMARY KEY,
+            last_fetch TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_summary_new (
+            city TEXT,
+            date TEXT,
+            avg_temp REAL,
+            min_temp REAL,
+            max_temp REAL,
+            category TEXT,
+            PRIMARY KEY (city, date)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS cleaned_weather (
+            city TEXT,
+            temperature REAL,
+            condition TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS cleaning_log (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            total_records INTEGER,
+            cleaned INTEGER,
+            skipped INTEGER
+        )
+        '''
+    ]),
+    (2, "incremental summary and export state", [
+        '''
+        CREATE TABLE IF NOT EXISTS daily_summary_state (
+            city TEXT,
+            date TEXT,
+            sum_temp REAL,
+            count INTEGER,
+            min_temp REAL,
+            max_temp REAL,
+            PRIMARY KEY (city, date)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS summary_watermark (
+            name TEXT PRIMARY KEY,
+            last_rowid INTEGER
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS export_watermark (
+            name TEXT PRIMARY KEY,
+            last_rowid INTEGER
+        )
+        '''
+    ]),
+    (3, "day column and covering indexes", [
+        # Virtual generated columns can be added to an existing table without a rewrite
+        "ALTER TABLE weather ADD COLUMN day TEXT GENERATED ALWAYS AS (DATE(date)) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_weather_city_day ON weather (city, day, temp)",
+        "CREATE INDEX IF NOT EXISTS idx_weather_city_date ON weather (city, date)"
+        # No index on temperature: nothing queries by it, and every insert would pay for one
+    ]),
+    (4, "http response cache", [
+        '''
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            body BLOB,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL,
+            last_access REAL
+        )
+        '''
+    ]),
+    (5, "last seen observation per city", [
+        "ALTER TABLE last_updated ADD COLUMN observation_key TEXT"
+    ]),
+    (6, "pipeline run metrics", [
+        '''
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pipeline TEXT,
+            started_at TEXT,
+            seconds REAL,
+            status TEXT,
+            stages TEXT,
+            counters TEXT,
+            peak_memory_kb REAL,
+            profile_path TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_pipeline_runs_pipeline ON pipeline_runs (pipeline, started_at)"
+    ]),
+    (7, "bulk load checkpoints", [
+        '''
+        CREATE TABLE IF NOT EXISTS load_checkpoints (
+            source TEXT,
+            target TEXT,
+            byte_offset INTEGER,
+            loaded INTEGER,
+            skipped INTEGER,
+            updated_at TEXT,
+            PRIMARY KEY (source, target)
+        )
+        '''
+    ]),
+    (8, "hourly rollup and retention index", [
+        '''
+        CREATE TABLE IF NOT EXISTS hourly_summary (
+            city TEXT,
+            hour TEXT,
+            sum_temp REAL,
+            count INTEGER,
+            min_temp REAL,
+            max_temp REAL,
+            PRIMARY KEY (city, hour)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_weather_date ON weather (date)",
+        "CREATE INDEX IF NOT EXISTS idx_hourly_summary_hour ON hourly_summary (hour)"
+    ]),
+    (9, "report cache", [
+        '''
+        CREATE TABLE IF NOT EXISTS report_cache (
+            cache_key TEXT PRIMARY KEY,
+            last_rowid INTEGER,
+            last_run_id INTEGER,
+            rows INTEGER,
+            state BLOB,
+            report_text TEXT,
+            report_path TEXT,
+            updated_at TEXT
+        )
+        '''
+    ])
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+
+def configure(conn):
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Bring the database up to LATEST_VERSION. Returns the versions applied."""
+    applied = []
+    current = get_version(conn)
+    for version, _, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        # Python's sqlite3 does not wrap DDL in a transaction, so do it explicitly
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_version(conn) >= version:
+                conn.execute("ROLLBACK")
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        applied.append(version)
+
+    if applied:
+        conn.execute("ANALYZE")
+    return applied
+
+
+def ensure_schema(conn, db_path):
+    # Migrations are checked once per database per process
+    with _migrate_lock:
+        if db_path in _migrated:
+            return
+        migrate(conn)
+        _migrated.add(db_path)
+
+
+def connect(db_path='weather.db', **kwargs):
+    conn = sqlite3.connect(db_path, **kwargs)
+    configure(conn)
+    ensure_schema(conn, db_path)
+    return conn
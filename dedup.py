@@ -0,0 +1,47 @@
+import hashlib
+import json
+import threading
+
+from db import get_database
+
+
+def observation_key(current):
+    """Identify one upstream observation from a current_condition entry.
+
+    wttr.in stamps each observation with localObsDateTime / observation_time;
+    when neither is present the reading content itself is hashed.
+    """
+    stamp = current.get("localObsDateTime") or current.get("observation_time")
+    if stamp:
+        return f"obs:{stamp}"
+    content = json.dumps([current.get("temp_C"), current.get("humidity"), current.get("weatherDesc")],
+                         sort_keys=True)
+    return "sha1:" + hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+# === Change-data deduplication ===
+class ObservationDeduper:
+    """Remembers the last observation written per city so repeats are skipped."""
+
+    def __init__(self, db_path='weather.db'):
+        self.db = get_database(db_path)
+        self.last_seen = {}
+        self.lock = threading.Lock()
+        self.skipped = 0
+        self.warm()
+
+    def warm(self):
+        # last_updated.observation_key is written alongside every stored reading
+        rows = self.db.query('SELECT city, observation_key FROM last_updated WHERE observation_key IS NOT NULL')
+        with self.lock:
+            self.last_seen.update(rows)
+        return len(rows)
+
+    def is_new(self, city, key):
+        """Return True and remember key if it differs from the city's last observation."""
+        with self.lock:
+            if self.last_seen.get(city) == key:
+                self.skipped += 1
+                return False
+            self.last_seen[city] = key
+            return True
@@ -0,0 +1,89 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Minimal j1 payload with the fields the pipelines read
+PAYLOAD = json.dumps({
+    "current_condition": [{
+        "localObsDateTime": "2025-04-14 06:00 PM",
+        "temp_C": "24",
+        "humidity": "60",
+        "weatherDesc": [{"value": "Sunny"}]
+    }]
+}).encode("utf-8")
+
+# ok    - 200 with PAYLOAD
+# slow  - 200 after `delay` seconds
+# error - 503 every time
+# flaky - 503 with probability `failure_rate`, otherwise 200
+# drop  - close the connection without answering
+MODES = ("ok", "slow", "error", "flaky", "drop")
+
+
+class FaultHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = server.rng.random() < server.failure_rate
+
+        if server.mode == "drop":
+            self.close_connection = True
+            self.connection.close()
+            return
+        if server.mode == "slow":
+            time.sleep(server.delay)
+        if server.mode == "error" or (server.mode == "flaky" and fail):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FaultServer(ThreadingHTTPServer):
+    """Local stand-in for wttr.in whose failure mode can be switched at runtime."""
+
+    request_queue_size = 256
+    daemon_threads = True
+
+    def __init__(self, mode="ok", delay=1.0, failure_rate=0.5, seed=0, address=("127.0.0.1", 0)):
+        super().__init__(address, FaultHandler)
+        self.mode = mode
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def url_template(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/{{city}}?format=j1"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow or dropped responses is the point; don't print tracebacks
+        pass
+
+    def set_mode(self, mode, **options):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode}; expected one of {MODES}")
+        self.mode = mode
+        for name, value in options.items():
+            setattr(self, name, value)
@@ -1,89 +1,128 @@
-import schedule
+"""All-cities pipeline: fetch and store every reading, export daily.
+
+Importing this module has no side effects. Call setup() before the fetch
+jobs; `python -m weatherctl run-scheduler --pipeline first` (or running this
+file) does that and blocks in the scheduler loop.
+"""
 import sqlite3
 import requests
 from datetime import datetime
-import time
-import csv
 import logging
+import os
+from weather_fetcher import fetch_all
+from scheduler import Scheduler
+from metrics import instrumented, span, start_http_server
+from pipeline_config import RETRY_DELAY, CityRegistry, ConfigWatcher, load_config, parse_shard
+from weather_writer import WeatherWriter
+from http_cache import ResponseCache
+from wttr_parser import parse_weather_payload
+from dedup import ObservationDeduper, observation_key
+import weather_export
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(HERE, "first_config.json")
+DB_PATH = 'weather.db'
+
+# Shared state, created by setup()
+writer = None
+response_cache = None
+deduper = None
+city_registry = None
+config_watcher = None
+
+
+def run_db():
+    # Resolved when each run ends, so runs follow the database setup() chose
+    return DB_PATH
+
 
 # === Set up logging ===
-logging.basicConfig(filename='weather_pipeline.log', level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+def setup_logging(path='weather_pipeline.log'):
+    logging.basicConfig(filename=path, level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def setup(db_path=DB_PATH, config_file=CONFIG_FILE, shard=None, live=True):
+    """Create the writer, caches and city registry the jobs share.
+
+    live is accepted for symmetry with Refined_pipeline.setup; this pipeline
+    keeps no in-memory read state.
+    """
+    global DB_PATH, writer, response_cache, deduper, city_registry, config_watcher
+    DB_PATH = db_path
+
+    # === Shared batched writer ===
+    writer = WeatherWriter(db_path)
+
+    # wttr.in refreshes observations every 15-30 minutes, so cache responses for 15.
+    # Only current_condition is parsed and kept from each payload.
+    response_cache = ResponseCache(db_path, ttl=900, parse=parse_weather_payload)
+
+    # Last observation per city, warmed from last_updated
+    deduper = ObservationDeduper(db_path)
+
+    # === City registry ===
+    # Cities, poll intervals and priorities come from first_config.json and are reloaded
+    # when the file changes. WEATHER_SHARD=i/n splits the cities across n processes.
+    shard = shard or parse_shard(os.environ.get("WEATHER_SHARD", "0/1"))
+    city_registry = CityRegistry.from_config(load_config(config_file), shard)
+    config_watcher = ConfigWatcher(config_file, city_registry)
+
+
+def close():
+    # Flushes buffered readings; the connections belong to the shared pool
+    writer.close()
+
 
 # === Export function ===
+@instrumented("first_export_csv", db_path=run_db)
 def export_weather_to_csv():
     try:
-        conn = sqlite3.connect('weather.db')
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM weather')
-        rows = cursor.fetchall()
-
         filename = f"weather_{datetime.now().strftime('%Y-%m-%d')}.csv"
-        with open(filename, mode="w", newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(['City', 'Date', 'Condition', 'Temperature'])
-            writer.writerows(rows)
-
-        logging.info(f"Exported weather data to {filename}")
-        print(f"Exported to {filename}")
-        conn.close()
+        path, count = weather_export.export_weather_to_csv(DB_PATH, filename)
+
+        logging.info(f"Exported {count} weather rows to {path}")
+        print(f"Exported to {path}")
     except Exception as e:
         logging.error(f"Export failed: {e}")
         print("Export failed. Check logs.")
 
 # === Fetching + Storing function ===
 def job():
-    cities = ["London", "New York", "Kolkata", "Melbourne", "Auckland", "Tokyo"]
-    for city in cities:
+    # Only cities whose poll interval has elapsed, highest priority first
+    cities = city_registry.due(limit=config_watcher.config.get("max_cities_per_tick"))
+    if cities:
+        fetch_and_store(cities)
+
+@instrumented("first_fetch", db_path=run_db)
+def fetch_and_store(cities):
+    with span("fetch"):
+        # Whole fetch stage gets 30s; a down upstream trips the breaker instead of timing out per city
+        results = fetch_all(cities, cache=response_cache, deadline=30)
+
+    # A failed poll is retried shortly instead of waiting out the city's whole interval
+    failed = city_registry.retry([city for city, data, error in results if error is not None])
+    if failed:
+        logging.warning(f"Polls failed for {len(failed)} cities, retrying in {RETRY_DELAY}s: {', '.join(failed)}")
+
+    for city, data, error in results:
         try:
-            url = f"https://wttr.in/{city}?format=j1"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            if error:
+                raise error
 
             current = data['current_condition'][0]
             condition = current['weatherDesc'][0]['value']
             temp = float(current['temp_C'])
             date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+            # Same upstream observation as last time: nothing new to store
+            observation = observation_key(current)
+            if not deduper.is_new(city, observation):
+                logging.info(f"Unchanged observation skipped for {city}")
+                continue
+
             # === DB operations ===
-            conn = sqlite3.connect('weather.db')
-            cursor = conn.cursor()
-
-            # Create weather table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS weather (
-                    city TEXT,
-                    date TEXT,
-                    state TEXT,
-                    temp REAL
-                )
-            ''')
-
-            # Create last_updated table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS last_updated (
-                    city TEXT PRIMARY KEY,
-                    last_fetch TEXT
-                )
-            ''')
-
-            # Insert weather
-            cursor.execute('''
-                INSERT INTO weather (city, date, state, temp)
-                VALUES (?, ?, ?, ?)
-            ''', (city, date, condition, temp))
-
-            # Update last_updated
-            cursor.execute('''
-                INSERT INTO last_updated (city, last_fetch)
-                VALUES (?, ?)
-                ON CONFLICT(city) DO UPDATE SET last_fetch = excluded.last_fetch
-            ''', (city, date))
-
-            conn.commit()
-            conn.close()
+            writer.add(city, date, condition, temp, observation)
 
             logging.info(f"Weather fetched and saved for {city}")
             print(f"Weather in {city}")
@@ -103,11 +142,39 @@ def job():
             logging.critical(f"Unexpected error for {city}: {e}")
             print(f"Unexpected error for {city}")
 
+    logging.info(f"HTTP cache counters: {response_cache.counters()}")
+
+    # One transaction for the whole run
+    try:
+        with span("write"):
+            writer.flush()
+    except sqlite3.Error as e:
+        logging.error(f"DB error while writing batch: {e}")
+        print("DB error while writing batch")
+
 # === Scheduling ===
-schedule.every(1).minutes.do(job)
-schedule.every().day.at("22:33").do(export_weather_to_csv)
+def build_scheduler(max_workers=4):
+    scheduler = Scheduler(max_workers=max_workers)
+    # Ticks often; each city is only fetched once its own interval has passed
+    scheduler.every(10, job)
+    scheduler.every(5, config_watcher.check, name="reload_config")
+    scheduler.daily("22:33", export_weather_to_csv)
+    return scheduler
+
+def run_scheduler(max_workers=4, metrics_port=None, api_port=None):
+    """Run every job on its schedule until SIGINT/SIGTERM. Needs setup()."""
+    # Prometheus scrape endpoint, e.g. WEATHER_METRICS_PORT=9108
+    if metrics_port:
+        start_http_server(metrics_port)
+
+    try:
+        # Blocks until SIGINT/SIGTERM, then lets running jobs finish
+        build_scheduler(max_workers).run_forever()
+    finally:
+        close()
 
 # === Run loop ===
-while True:
-    schedule.run_pending()
-    time.sleep(1)
+if __name__ == "__main__":
+    setup_logging()
+    setup()
+    run_scheduler(metrics_port=int(os.environ.get("WEATHER_METRICS_PORT") or 0))
@@ -0,0 +1,165 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+from db import get_database
+
+
+class _Flight:
+    # One in-progress upstream request that other callers for the same URL wait on
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# === Response cache ===
+class ResponseCache:
+    """TTL + LRU cache for JSON responses, persisted to the http_cache table.
+
+    Fresh entries are served from memory. Stale entries are revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged upstream answers 304
+    with no body. Concurrent requests for the same URL share one fetch.
+    parse turns a response body into the object that is cached and returned.
+    """
+
+    def __init__(self, db_path='weather.db', ttl=900, max_entries=5000, parse=json.loads):
+        self.db = get_database(db_path)
+        self.parse = parse
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "coalesced": 0, "evictions": 0}
+        self._load()
+
+    def _load(self):
+        # Warm the in-memory LRU with the most recently used entries from disk
+        rows = self.db.query('''
+            SELECT url, body, etag, last_modified, fetched_at FROM http_cache
+            ORDER BY last_access DESC
+            LIMIT ?
+        ''', (self.max_entries,))
+        for url, body, etag, last_modified, fetched_at in reversed(rows):
+            try:
+                data = self.parse(body)
+            except (ValueError, KeyError):
+                continue
+            self.entries[url] = {"data": data, "etag": etag, "last_modified": last_modified,
+                                 "fetched_at": fetched_at}
+
+    def get(self, url, request):
+        """Return parsed JSON for url.
+
+        request(headers) must perform the HTTP GET and return the response; it
+        is only called on a miss or when revalidating a stale entry.
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry and time.time() - entry["fetched_at"] < self.ttl:
+                self.entries.move_to_end(url)
+                self.stats["hits"] += 1
+                return entry["data"]
+
+            flight = self.inflight.get(url)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[url] = _Flight()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._fetch(url, entry, request)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            flight.event.set()
+            with self.lock:
+                del self.inflight[url]
+
+    def _fetch(self, url, entry, request):
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = request(headers)
+        now = time.time()
+
+        if response.status_code == 304 and entry:
+            entry["fetched_at"] = now
+            self._touch(url, entry, None)
+            with self.lock:
+                self.stats["revalidated"] += 1
+            return entry["data"]
+
+        if response.status_code == 304:
+            # Nothing cached to revalidate (evicted meanwhile, or a proxy answered): a miss, ask for the body
+            response = request({"Cache-Control": "no-cache"})
+            now = time.time()
+            if response.status_code == 304:
+                raise requests.exceptions.HTTPError(f"304 Not Modified for {url} with no cached copy",
+                                                    response=response)
+
+        response.raise_for_status()
+        body = response.content
+        entry = {
+            "data": self.parse(body),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now
+        }
+        self._touch(url, entry, body)
+        with self.lock:
+            self.stats["misses"] += 1
+        return entry["data"]
+
+    def _touch(self, url, entry, body):
+        with self.lock:
+            self.entries[url] = entry
+            self.entries.move_to_end(url)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+                self.stats["evictions"] += 1
+
+        try:
+            with self.db.transaction() as conn:
+                if body is None:
+                    self.db.execute(conn, 'UPDATE http_cache SET fetched_at = ?, last_access = ? WHERE url = ?',
+                                    (entry["fetched_at"], entry["fetched_at"], url))
+                else:
+                    self.db.execute(conn, '''
+                        INSERT INTO http_cache (url, body, etag, last_modified, fetched_at, last_access)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(url) DO UPDATE SET
+                            body = excluded.body,
+                            etag = excluded.etag,
+                            last_modified = excluded.last_modified,
+                            fetched_at = excluded.fetched_at,
+                            last_access = excluded.last_access
+                    ''', (url, body, entry["etag"], entry["last_modified"], entry["fetched_at"], entry["fetched_at"]))
+                if evicted:
+                    self.db.executemany(conn, 'DELETE FROM http_cache WHERE url = ?', [(u,) for u in evicted])
+        except Exception as e:
+            # The in-memory copy is still valid; persistence is best effort
+            logging.warning(f"Could not persist cache entry for {url}: {e}")
+
+    def counters(self):
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries))
@@ -0,0 +1,313 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import ContextDecorator, contextmanager
+from datetime import datetime
+from functools import wraps
+
+from db import get_database
+
+# Seconds; wide enough for a single HTTP call up to a full export
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+PREFIX = "weather_"
+
+_local = threading.local()
+
+
+# === Metric types ===
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+def _key(name, labels):
+    # Label values are strings in the exposition format; an int status and "error" must still sort together
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Registry:
+    """Process-wide counters, gauges and histograms keyed by name + labels."""
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def prometheus_text(self):
+        """Render every metric in the Prometheus text exposition format.
+
+        >>> registry = Registry()
+        >>> registry.inc("http_requests_total", status=200)
+        >>> registry.inc("http_requests_total", status="error")
+        >>> print(registry.prometheus_text(), end="")
+        # TYPE weather_http_requests_total counter
+        weather_http_requests_total{status="200"} 1
+        weather_http_requests_total{status="error"} 1
+        """
+        lines = []
+        with self.lock:
+            for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({name for name, _ in metrics}):
+                    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                    for (metric, labels), value in sorted(metrics.items()):
+                        if metric == name:
+                            lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le='+Inf')} {histogram.count}")
+                    lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {histogram.sum}")
+                    lines.append(f"{PREFIX}{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+registry = Registry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+    run = current_run()
+    if run is not None:
+        run.count(name, value)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+def set_gauge(name, value, **labels):
+    registry.set(name, value, **labels)
+
+
+# === Spans ===
+class span(ContextDecorator):
+    """Time a stage: `with span("clean"):` or `@span("clean")`.
+
+    The duration goes into the stage_seconds histogram and, when a
+    PipelineRun is active on this thread, into that run's stage timings.
+    """
+
+    def __init__(self, stage, **labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        registry.observe("stage_seconds", self.seconds, stage=self.stage, **self.labels)
+        run = current_run()
+        if run is not None:
+            run.stages[self.stage] = run.stages.get(self.stage, 0.0) + self.seconds
+        return False
+
+
+# === Runs ===
+def current_run():
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def attach(run):
+    """Make run the current run on this thread, e.g. inside a worker pool task."""
+    previous = current_run()
+    _local.run = run
+    try:
+        yield run
+    finally:
+        _local.run = previous
+
+
+class PipelineRun:
+    """One pipeline execution; persisted to pipeline_runs when it ends.
+
+    profile=True captures a cProfile dump under profiles/, and
+    trace_memory=True records the tracemalloc peak for the run. db_path
+    defaults to $WEATHER_DB, then weather.db, like get_database; it may be a
+    callable, which is resolved when the run is saved.
+    """
+
+    def __init__(self, pipeline, db_path=None, profile=False, trace_memory=False,
+                 profile_dir="profiles"):
+        self.pipeline = pipeline
+        self.db_path = db_path
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages = {}
+        self.counters = {}
+        self.peak_memory_kb = None
+        self.profile_path = None
+        self.status = "ok"
+        self.lock = threading.Lock()
+
+    def count(self, name, value=1):
+        # Worker threads attached to the run count concurrently
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def __enter__(self):
+        self.parent = current_run()
+        _local.run = self
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+
+        # cProfile and tracemalloc are only imported when asked for, to keep CLI startup fast
+        self._profiler = None
+        if self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._started_tracing = False
+        if self.trace_memory:
+            import tracemalloc
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        _local.run = self.parent
+        if exc_type is not None:
+            self.status = "failed"
+
+        if self._profiler:
+            self._profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            stamp = self.started_at.strftime("%Y-%m-%d_%H-%M-%S")
+            self.profile_path = os.path.join(self.profile_dir, f"{self.pipeline}_{stamp}.prof")
+            self._profiler.dump_stats(self.profile_path)
+        if self.trace_memory:
+            import tracemalloc
+            self.peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+            if self._started_tracing:
+                tracemalloc.stop()
+
+        registry.observe("run_seconds", self.seconds, pipeline=self.pipeline)
+        registry.inc("runs_total", pipeline=self.pipeline, status=self.status)
+        self._persist()
+        return False
+
+    def _persist(self):
+        # Metrics must never fail the pipeline itself
+        try:
+            database = get_database(self.db_path() if callable(self.db_path) else self.db_path)
+            with database.transaction() as conn:
+                database.execute(conn, '''
+                    INSERT INTO pipeline_runs
+                        (pipeline, started_at, seconds, status, stages, counters, peak_memory_kb, profile_path)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (self.pipeline, self.started_at.strftime("%Y-%m-%d %H:%M:%S"), self.seconds, self.status,
+                      json.dumps(self.stages), json.dumps(self.counters), self.peak_memory_kb, self.profile_path))
+        except Exception as e:
+            logging.warning(f"Could not record pipeline run for {self.pipeline}: {e}")
+
+    def summary(self):
+        lines = [f"{stage}: {seconds:.4f} seconds" for stage, seconds in self.stages.items()]
+        lines.append(f"Total {self.pipeline} execution time: {self.seconds:.4f} seconds")
+        if self.peak_memory_kb is not None:
+            lines.append(f"Peak traced memory: {self.peak_memory_kb:.0f} KiB")
+        if self.profile_path:
+            lines.append(f"Profile written to {self.profile_path}")
+        return lines
+
+
+def instrumented(pipeline, db_path=None, **options):
+    """Decorator: every call of the function is recorded as its own PipelineRun."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with PipelineRun(pipeline, db_path, **options):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# === Exposition ===
+def start_http_server(port=9108, host=""):
+    """Serve /metrics for Prometheus from a daemon thread."""
+    # http.server pulls in email/ssl; only long-running processes pay for it
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_prometheus(path):
+    # For node_exporter's textfile collector; renamed into place so it is never half-written
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(registry.prometheus_text())
+    os.replace(tmp, path)
@@ -0,0 +1,180 @@
+import csv
+import io
+import itertools
+import time
+
+import metrics
+from db import get_database, to_format_params
+
+# Postgres versions of the SQLite tables; db_schema's migrations are SQLite only
+POSTGRES_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS weather (
+        city TEXT,
+        date TEXT,
+        state TEXT,
+        temp DOUBLE PRECISION
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS last_updated (
+        city TEXT PRIMARY KEY,
+        last_fetch TEXT,
+        observation_key TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cleaned_weather (
+        city TEXT,
+        temperature DOUBLE PRECISION,
+        condition TEXT
+    )
+    '''
+]
+
+# Session-local staging table; emptied automatically at every commit
+CREATE_STAGE = '''
+    CREATE TEMP TABLE IF NOT EXISTS last_updated_stage (
+        city TEXT,
+        last_fetch TEXT,
+        observation_key TEXT
+    ) ON COMMIT DELETE ROWS
+'''
+
+MERGE_LAST_UPDATED = '''
+    INSERT INTO last_updated (city, last_fetch, observation_key)
+    SELECT DISTINCT ON (city) city, last_fetch, observation_key
+    FROM last_updated_stage
+    ORDER BY city, last_fetch DESC
+    ON CONFLICT (city) DO UPDATE SET
+        last_fetch = excluded.last_fetch,
+        observation_key = COALESCE(excluded.observation_key, last_updated.observation_key)
+'''
+
+
+# === COPY streaming ===
+class CsvStream(io.RawIOBase):
+    """File-like view of rows as CSV, produced on demand while COPY reads it.
+
+    Only one chunk of rows is formatted at a time, so a COPY of any size
+    runs in constant memory.
+    """
+
+    def __init__(self, rows, rows_per_chunk=5000):
+        self.rows = iter(rows)
+        self.rows_per_chunk = rows_per_chunk
+        self.buffer = b""
+        self.position = 0
+        self.count = 0
+        self.text = io.StringIO()
+        self.writer = csv.writer(self.text, lineterminator="\n")
+
+    def readable(self):
+        return True
+
+    def _next_chunk(self):
+        chunk = list(itertools.islice(self.rows, self.rows_per_chunk))
+        self.count += len(chunk)
+        self.text.seek(0)
+        self.text.truncate()
+        self.writer.writerows(chunk)
+        self.buffer, self.position = self.text.getvalue().encode("utf-8"), 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self.buffer[self.position:]]
+            while True:
+                self._next_chunk()
+                if not self.buffer:
+                    return b"".join(parts)
+                parts.append(self.buffer)
+
+        if self.position >= len(self.buffer):
+            self._next_chunk()
+        data = self.buffer[self.position:self.position + size]
+        self.position += len(data)
+        return data
+
+    def readinto(self, target):
+        data = self.read(len(target))
+        target[:len(data)] = data
+        return len(data)
+
+
+def copy_rows(conn, table, columns, rows):
+    """COPY rows into table in one streamed pass. Returns the number of rows sent.
+
+    Works with any connection whose cursor has psycopg2's copy_expert().
+    None and empty strings are written as empty unquoted fields, which COPY reads as NULL.
+    """
+    stream = CsvStream(rows)
+    with conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream)
+    return stream.count
+
+
+# === Sink ===
+class PostgresSink:
+    """Bulk writes and streaming reads for the weather tables on Postgres."""
+
+    def __init__(self, target):
+        self.db = get_database(target)
+        if self.db.backend != "postgres":
+            raise ValueError(f"PostgresSink needs a postgres:// URL, got {target}")
+        with self.db.transaction() as conn:
+            with conn.cursor() as cursor:
+                for statement in POSTGRES_TABLES:
+                    cursor.execute(statement)
+
+    def write_cleaned(self, rows):
+        """Append (city, temperature, condition) rows to cleaned_weather."""
+        start = time.perf_counter()
+        with self.db.transaction() as conn:
+            count = copy_rows(conn, "cleaned_weather", ("city", "temperature", "condition"), rows)
+        self._record("cleaned_weather", count, start)
+        return count
+
+    def write_weather(self, rows):
+        """Append (city, date, condition, temp[, observation_key]) readings and merge last_updated.
+
+        Readings are COPYed straight into weather; the newest fetch per city
+        goes through a staging table and one INSERT ... ON CONFLICT.
+        """
+        latest = {}
+
+        def readings():
+            for row in rows:
+                city, date = row[0], row[1]
+                key = row[4] if len(row) > 4 else None
+                if city not in latest or date > latest[city][0]:
+                    latest[city] = (date, key)
+                yield row[:4]
+
+        start = time.perf_counter()
+        with self.db.transaction() as conn:
+            count = copy_rows(conn, "weather", ("city", "date", "state", "temp"), readings())
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_STAGE)
+            copy_rows(conn, "last_updated_stage", ("city", "last_fetch", "observation_key"),
+                      ((city, date, key) for city, (date, key) in latest.items()))
+            with conn.cursor() as cursor:
+                cursor.execute(MERGE_LAST_UPDATED)
+        self._record("weather", count, start)
+        return count
+
+    def _record(self, table, count, start):
+        metrics.observe("db_commit_seconds", time.perf_counter() - start, table=table)
+        metrics.inc("rows_written_total", count, table=table)
+
+    def iter_rows(self, sql, params=(), itersize=10000):
+        """Yield rows through a server-side cursor, itersize rows per round trip.
+
+        The result set stays on the server, so a full-table scan never has to
+        fit in client memory. sql uses ? placeholders like the rest of db.py.
+        """
+        with self.db.connection() as conn:
+            with conn.cursor(name=f"weather_read_{id(conn)}") as cursor:
+                cursor.itersize = itersize
+                cursor.execute(to_format_params(sql), params)
+                yield from cursor
+            conn.commit()
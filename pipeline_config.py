@@ -0,0 +1,274 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+
+DEFAULT_INTERVAL = 60
+DEFAULT_PRIORITY = 0
+# Seconds before a city whose poll failed is tried again (capped at its interval)
+RETRY_DELAY = 10
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class ConfigError(ValueError):
+    pass
+
+
+# === Loading ===
+def load_config(path):
+    """Load and validate a JSON config file.
+
+    The parsed config is cached and only re-read when the file's mtime or
+    size changes, so calling this on every scheduler tick is cheap. The
+    returned dict is shared between callers; treat it as read-only.
+    """
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Configuration file {path} not found.")
+
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"{path} is not valid JSON: {e}") from e
+    validate(config, path)
+
+    with _cache_lock:
+        _cache[path] = (stamp, config)
+    return config
+
+
+def validate(config, source="config"):
+    if not isinstance(config, dict):
+        raise ConfigError(f"{source}: top level must be an object")
+
+    interval = config.get("default_interval", DEFAULT_INTERVAL)
+    if not _positive_number(interval):
+        raise ConfigError(f"{source}: default_interval must be a positive number of seconds")
+
+    thresholds = config.get("temperature_thresholds")
+    if thresholds is not None:
+        if not all(_number(thresholds.get(key)) for key in ("hot", "warm")):
+            raise ConfigError(f"{source}: temperature_thresholds needs numeric hot and warm")
+        if thresholds["warm"] > thresholds["hot"]:
+            raise ConfigError(f"{source}: temperature_thresholds.warm is above hot")
+
+    limit = config.get("max_cities_per_tick")
+    if limit is not None and not (isinstance(limit, int) and not isinstance(limit, bool) and limit > 0):
+        raise ConfigError(f"{source}: max_cities_per_tick must be a positive integer")
+
+    retention = config.get("retention")
+    if retention is not None:
+        if not isinstance(retention, dict):
+            raise ConfigError(f"{source}: retention must be an object")
+        for key in ("raw_days", "hourly_days"):
+            if key in retention and not _positive_number(retention[key]):
+                raise ConfigError(f"{source}: retention.{key} must be a positive number of days")
+
+    for key in ("output_folder", "db_path"):
+        if key in config and not (isinstance(config[key], str) and config[key]):
+            raise ConfigError(f"{source}: {key} must be a non-empty string")
+
+    names = set()
+    for entry in config.get("cities", []):
+        city = parse_city(entry, interval, source)
+        if city.name in names:
+            raise ConfigError(f"{source}: city {city.name!r} is listed twice")
+        names.add(city.name)
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _positive_number(value):
+    return _number(value) and value > 0
+
+
+# === City registry ===
+class City:
+    __slots__ = ("name", "interval", "priority")
+
+    def __init__(self, name, interval=DEFAULT_INTERVAL, priority=DEFAULT_PRIORITY):
+        self.name = name
+        self.interval = interval
+        self.priority = priority
+
+    def __repr__(self):
+        return f"City({self.name!r}, interval={self.interval}, priority={self.priority})"
+
+
+def parse_city(entry, default_interval=DEFAULT_INTERVAL, source="config"):
+    # Either "London" or {"name": "London", "interval": 300, "priority": 5}
+    if isinstance(entry, str):
+        entry = {"name": entry}
+    if not isinstance(entry, dict):
+        raise ConfigError(f"{source}: city entries must be names or objects, got {entry!r}")
+
+    name = entry.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ConfigError(f"{source}: city entry {entry!r} has no name")
+    interval = entry.get("interval", default_interval)
+    if not _positive_number(interval):
+        raise ConfigError(f"{source}: interval for {name!r} must be a positive number of seconds")
+    priority = entry.get("priority", DEFAULT_PRIORITY)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise ConfigError(f"{source}: priority for {name!r} must be an integer")
+    return City(name.strip(), interval, priority)
+
+
+def parse_shard(value):
+    """'2/8' -> (2, 8): this process handles shard 2 of 8."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ConfigError(f"Shard must look like 'index/count', got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ConfigError(f"Shard index must be in 0..{count - 1}, got {value!r}")
+    return index, count
+
+
+def shard_of(name, count):
+    # crc32 is stable across processes and restarts, unlike hash()
+    return zlib.crc32(name.encode("utf-8")) % count
+
+
+class CityRegistry:
+    """Cities this process polls, each with its own interval and priority.
+
+    A min-heap keyed by next due time means a tick only touches the cities
+    that are due, so thousands of slow long-tail cities cost nothing between
+    their polls. Only cities in this process's shard are kept.
+    """
+
+    def __init__(self, cities=(), shard=(0, 1)):
+        self.shard = shard
+        self.cities = {}
+        self.next_due = {}
+        self.heap = []
+        self.lock = threading.Lock()
+        self.update(cities)
+
+    @classmethod
+    def from_config(cls, config, shard=(0, 1)):
+        return cls(cities_from_config(config), shard)
+
+    def update(self, cities, now=None):
+        """Swap in a new city list; cities that stay keep their schedule."""
+        now = now or time.time()
+        index, count = self.shard
+        with self.lock:
+            cities = {city.name: city for city in cities if shard_of(city.name, count) == index}
+            for name in list(self.next_due):
+                if name not in cities:
+                    del self.next_due[name]
+            for name in cities:
+                # New cities are due immediately
+                self.next_due.setdefault(name, now)
+            self.cities = cities
+            self.heap = [(due, -cities[name].priority, name) for name, due in self.next_due.items()]
+            heapq.heapify(self.heap)
+
+    def due(self, now=None, limit=None):
+        """Names due for polling, highest priority first, at most limit of them.
+
+        Returned cities are rescheduled one interval ahead; pass the ones whose
+        poll failed to retry(). Cities beyond the limit stay due and are picked
+        up on the next call.
+        """
+        now = now or time.time()
+        picked = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                due, _, name = heapq.heappop(self.heap)
+                # Entries left behind by retry() no longer match next_due
+                if self.next_due.get(name) != due:
+                    continue
+                picked.append(self.cities[name])
+
+            picked.sort(key=lambda city: -city.priority)
+            if limit is not None:
+                picked, deferred = picked[:limit], picked[limit:]
+                for city in deferred:
+                    heapq.heappush(self.heap, (self.next_due[city.name], -city.priority, city.name))
+
+            for city in picked:
+                self.next_due[city.name] = now + city.interval
+                heapq.heappush(self.heap, (self.next_due[city.name], -city.priority, city.name))
+        return [city.name for city in picked]
+
+    def retry(self, names, delay=RETRY_DELAY, now=None):
+        """Bring failed cities forward to `delay` seconds from now instead of a full interval.
+
+        Returns the names that were rescheduled; unknown names are ignored.
+        """
+        now = now or time.time()
+        rescheduled = []
+        with self.lock:
+            for name in names:
+                city = self.cities.get(name)
+                if city is None:
+                    continue
+                due = now + min(delay, city.interval)
+                if due < self.next_due[name]:
+                    self.next_due[name] = due
+                    heapq.heappush(self.heap, (due, -city.priority, name))
+                    rescheduled.append(name)
+        return rescheduled
+
+    def names(self):
+        with self.lock:
+            return list(self.cities)
+
+    def __len__(self):
+        return len(self.cities)
+
+
+def cities_from_config(config):
+    interval = config.get("default_interval", DEFAULT_INTERVAL)
+    return [parse_city(entry, interval) for entry in config.get("cities", [])]
+
+
+# === Hot reload ===
+class ConfigWatcher:
+    """Reload a config file when it changes and push the cities into a registry.
+
+    check() is meant to run as a frequent scheduler job. A broken edit is
+    logged and the last good config stays in effect.
+    """
+
+    def __init__(self, path, registry=None, on_change=None):
+        self.path = path
+        self.registry = registry
+        self.on_change = on_change
+        self.config = load_config(path)
+
+    def check(self):
+        try:
+            config = load_config(self.path)
+        except (OSError, ConfigError) as e:
+            logging.error(f"Keeping previous config, reload of {self.path} failed: {e}")
+            return False
+
+        if config is self.config:
+            return False
+
+        self.config = config
+        if self.registry is not None:
+            self.registry.update(cities_from_config(config))
+        if self.on_change:
+            self.on_change(config)
+        logging.info(f"Reloaded {self.path}: {len(config.get('cities', []))} cities")
+        return True
@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+
+import requests
+
+import metrics
+
+# Statuses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The host failed repeatedly; calls are rejected until the breaker half-opens."""
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The run's time budget ran out before this request could be made."""
+
+
+# === Backoff ===
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep uniform(0, min(cap, base * 2**attempt))."""
+
+    def __init__(self, attempts=3, base=0.2, cap=2.0, statuses=RETRY_STATUSES, rng=None):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.statuses = statuses
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt):
+        return self.rng.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+# === Circuit breaker ===
+class CircuitBreaker:
+    """closed -> open after failure_threshold consecutive failures.
+
+    While open every call fails immediately. After reset_timeout one trial
+    call is let through (half-open); its result closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            now = self.clock()
+            # Open long enough, or a previous trial never reported back
+            if now - self.opened_at >= self.reset_timeout:
+                # Only this caller gets the trial request
+                self.state = "half_open"
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = self.clock()
+
+
+class HostBreakers:
+    """One CircuitBreaker per host, created on first use."""
+
+    def __init__(self, **options):
+        self.options = options
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get(self, host):
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(**self.options)
+            return breaker
+
+    def states(self):
+        with self.lock:
+            return {host: breaker.state for host, breaker in self.breakers.items()}
+
+
+# === Deadline ===
+class Deadline:
+    """Time budget shared by every request in one run."""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds if seconds is not None else None
+
+    def remaining(self):
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - self.clock())
+
+    def clamp(self, timeout):
+        """Shrink a (connect, read) timeout so the request cannot outlive the budget."""
+        remaining = self.remaining()
+        if remaining == float("inf"):
+            return timeout
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        return min(connect, remaining), min(read, remaining)
+
+
+# === Resilient call ===
+def call_with_retries(send, host, timeout, policy=None, breakers=None, deadline=None, label=None,
+                      sleep=time.sleep):
+    """Call send(timeout) -> response with backoff, a per-host breaker and a deadline.
+
+    Retries connection errors, timeouts and RETRY_STATUSES. Returns the last
+    response (which may still be an error status) or raises the last error.
+    """
+    policy = policy or RetryPolicy(attempts=1)
+    deadline = deadline or Deadline(None)
+    breaker = breakers.get(host) if breakers is not None else None
+    label = label or host
+    error = None
+
+    for attempt in range(policy.attempts):
+        if deadline.remaining() <= 0:
+            raise DeadlineExceeded(f"Run deadline reached before requesting {label}")
+        if breaker and not breaker.allow():
+            metrics.inc("circuit_rejected_total", host=host)
+            raise CircuitOpenError(f"Circuit open for {host}, not requesting {label}")
+
+        try:
+            response = send(deadline.clamp(timeout))
+        except DeadlineExceeded:
+            # Raised by send itself (e.g. a rate limit slot past the deadline); not the host's fault
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error, response = e, None
+        else:
+            error = None
+            if response.status_code not in policy.statuses:
+                if breaker:
+                    breaker.record_success()
+                return response
+
+        if breaker:
+            breaker.record_failure()
+        if attempt + 1 < policy.attempts:
+            metrics.inc("http_retries_total", host=host)
+            sleep(min(policy.delay(attempt), deadline.remaining()))
+
+    if error is not None:
+        raise error
+    return response
@@ -0,0 +1,188 @@
+"""Tiered retention for the weather store.
+
+    raw readings (weather)     kept for raw_days, then deleted in small batches
+    hourly_summary             kept for hourly_days
+    daily_summary_new / state  kept forever
+
+Raw rows are rolled up before anything is deleted, and a row is never
+deleted before every incremental consumer (summaries, incremental exports)
+has moved past it.
+
+    python retention.py --raw-days 30 --hourly-days 365
+"""
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+
+import daily_summary
+import metrics
+from db import get_database
+
+MERGE_HOURLY = '''
+    INSERT INTO hourly_summary (city, hour, sum_temp, count, min_temp, max_temp)
+    SELECT city, substr(date, 1, 13) || ':00', SUM(temp), COUNT(*), MIN(temp), MAX(temp)
+    FROM weather
+    WHERE rowid > ? AND rowid <= ?
+    GROUP BY city, substr(date, 1, 13)
+    ON CONFLICT(city, hour) DO UPDATE SET
+        sum_temp = sum_temp + excluded.sum_temp,
+        count = count + excluded.count,
+        min_temp = MIN(min_temp, excluded.min_temp),
+        max_temp = MAX(max_temp, excluded.max_temp)
+'''
+
+DELETE_RAW_BATCH = '''
+    DELETE FROM weather WHERE rowid IN (
+        SELECT rowid FROM weather WHERE date < ? AND rowid <= ? LIMIT ?
+    )
+'''
+
+DELETE_HOURLY_BATCH = '''
+    DELETE FROM hourly_summary WHERE rowid IN (
+        SELECT rowid FROM hourly_summary WHERE hour < ? LIMIT ?
+    )
+'''
+
+
+# === Rollups ===
+def update_hourly_summary_incremental(conn, name='hourly_summary'):
+    """Fold weather rows added since the last run into hourly_summary.
+
+    Same rowid watermark scheme as daily_summary. Runs inside the caller's
+    transaction and returns the number of new readings processed.
+    """
+    cursor = conn.cursor()
+    row = cursor.execute('SELECT last_rowid FROM summary_watermark WHERE name = ?', (name,)).fetchone()
+    last_rowid = row[0] if row else 0
+    high_rowid = cursor.execute('SELECT COALESCE(MAX(rowid), 0) FROM weather').fetchone()[0]
+    if high_rowid <= last_rowid:
+        return 0
+
+    new_rows = cursor.execute(
+        'SELECT COUNT(*) FROM weather WHERE rowid > ? AND rowid <= ?', (last_rowid, high_rowid)
+    ).fetchone()[0]
+    cursor.execute(MERGE_HOURLY, (last_rowid, high_rowid))
+    cursor.execute('''
+        INSERT INTO summary_watermark (name, last_rowid)
+        VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET last_rowid = excluded.last_rowid
+    ''', (name, high_rowid))
+    return new_rows
+
+
+def rollup(db_path='weather.db'):
+    """Bring the hourly and daily rollups up to date in one transaction."""
+    with get_database(db_path).transaction() as conn:
+        hourly = update_hourly_summary_incremental(conn)
+        daily = daily_summary.update_daily_summary_incremental(conn)
+    return hourly, daily
+
+
+def safe_rowid(conn):
+    # Highest rowid that every rowid-watermark consumer has already processed
+    row = conn.execute('''
+        SELECT MIN(last_rowid) FROM (
+            SELECT last_rowid FROM summary_watermark
+            UNION ALL
+            SELECT last_rowid FROM export_watermark
+        )
+    ''').fetchone()
+    return row[0] or 0
+
+
+# === Deletes ===
+def delete_in_batches(db_path, sql, params, batch_size=5000, pause=0.01):
+    """Repeat a LIMITed DELETE in short transactions until it removes nothing.
+
+    Each batch holds the write lock only briefly, and the pause between
+    batches lets the pipeline's writers get in.
+    """
+    database = get_database(db_path)
+    deleted = 0
+    while True:
+        with database.transaction() as conn:
+            count = conn.execute(sql, (*params, batch_size)).rowcount
+        deleted += count
+        if count < batch_size:
+            return deleted
+        time.sleep(pause)
+
+
+def delete_old_readings(db_path, cutoff, batch_size=5000, pause=0.01):
+    with get_database(db_path).connection() as conn:
+        max_rowid = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM weather').fetchone()[0]
+        # weather has no AUTOINCREMENT: keep the newest row so rowids never go back below the watermarks
+        upto = min(safe_rowid(conn), max_rowid - 1)
+    return delete_in_batches(db_path, DELETE_RAW_BATCH, (cutoff, upto), batch_size, pause)
+
+
+def delete_old_hours(db_path, cutoff, batch_size=5000, pause=0.01):
+    return delete_in_batches(db_path, DELETE_HOURLY_BATCH, (cutoff,), batch_size, pause)
+
+
+# === Vacuum ===
+def enable_incremental_vacuum(db_path):
+    """Switch an existing file to auto_vacuum=INCREMENTAL (one full VACUUM, run once)."""
+    with get_database(db_path).connection() as conn:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        logging.info(f"Converting {db_path} to incremental auto-vacuum, this rewrites the file once")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+
+
+def incremental_vacuum(db_path, pages=2000):
+    """Return up to pages free pages to the OS. No-op unless auto_vacuum is INCREMENTAL."""
+    with get_database(db_path).connection() as conn:
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # execute() only steps the pragma once (one page); executescript runs it to completion
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return free_before - free_after
+
+
+# === Job ===
+def run_retention(db_path='weather.db', raw_days=30, hourly_days=365, batch_size=5000,
+                  vacuum_pages=2000, now=None):
+    now = now or datetime.now()
+    raw_cutoff = (now - timedelta(days=raw_days)).strftime("%Y-%m-%d %H:%M:%S")
+    hourly_cutoff = (now - timedelta(days=hourly_days)).strftime("%Y-%m-%d %H:00")
+
+    with metrics.span("rollup"):
+        hourly, daily = rollup(db_path)
+    with metrics.span("retention_delete"):
+        raw_deleted = delete_old_readings(db_path, raw_cutoff, batch_size)
+        hours_deleted = delete_old_hours(db_path, hourly_cutoff, batch_size)
+    with metrics.span("incremental_vacuum"):
+        pages = incremental_vacuum(db_path, vacuum_pages)
+
+    metrics.inc("rows_deleted_total", raw_deleted, table="weather")
+    metrics.inc("rows_deleted_total", hours_deleted, table="hourly_summary")
+    return {
+        "rolled_up_hourly": hourly,
+        "rolled_up_daily": daily,
+        "raw_deleted": raw_deleted,
+        "hourly_deleted": hours_deleted,
+        "pages_freed": pages
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll up and prune old weather readings.")
+    parser.add_argument("--db", default="weather.db")
+    parser.add_argument("--raw-days", type=int, default=30)
+    parser.add_argument("--hourly-days", type=int, default=365)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--vacuum-pages", type=int, default=2000)
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="convert an existing database file first (one full VACUUM)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum(args.db)
+    with metrics.PipelineRun("retention", args.db):
+        stats = run_retention(args.db, args.raw_days, args.hourly_days, args.batch_size, args.vacuum_pages)
+    print(stats)
@@ -0,0 +1,149 @@
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+# === Jobs ===
+class Job:
+    def __init__(self, func, name, interval=None, at=None, max_instances=1):
+        self.func = func
+        self.name = name
+        self.interval = interval
+        self.at = at
+        self.max_instances = max_instances
+        self.running = 0
+        self.next_run = None
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "missed_runs": 0,       # slots that passed while the job could not start
+            "overlaps_skipped": 0,  # due while a previous run was still going
+            "last_lag": 0.0,        # seconds between the slot and the actual start
+            "max_lag": 0.0,
+            "last_duration": 0.0
+        }
+
+    def schedule_first(self, now, run_now=False):
+        if run_now:
+            self.next_run = now
+        elif self.interval:
+            self.next_run = now + self.interval
+        else:
+            self.next_run = self._next_daily(now)
+
+    def schedule_next(self, now):
+        # Jump to the next future slot instead of queueing every slot that was missed
+        if self.interval:
+            missed = int((now - self.next_run) // self.interval)
+            self.next_run += (missed + 1) * self.interval
+        else:
+            missed = int((now - self.next_run) // 86400)
+            self.next_run = self._next_daily(now)
+        return missed
+
+    def _next_daily(self, now):
+        hour, minute = map(int, self.at.split(":"))
+        current = datetime.fromtimestamp(now)
+        target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target.timestamp() <= now:
+            target += timedelta(days=1)
+        return target.timestamp()
+
+
+# === Scheduler ===
+class Scheduler:
+    """Runs jobs on a worker pool; a job never overlaps itself beyond max_instances.
+
+    Nothing starts until run_forever() (or run_pending()) is called.
+    """
+
+    def __init__(self, max_workers=4):
+        self.jobs = []
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def every(self, seconds, func, name=None, max_instances=1, run_now=False):
+        job = Job(func, name or func.__name__, interval=seconds, max_instances=max_instances)
+        return self._add(job, run_now)
+
+    def daily(self, at, func, name=None, max_instances=1):
+        return self._add(Job(func, name or func.__name__, at=at, max_instances=max_instances))
+
+    def _add(self, job, run_now=False):
+        job.schedule_first(time.time(), run_now)
+        with self.lock:
+            self.jobs.append(job)
+        return job
+
+    def run_pending(self, now=None):
+        now = now or time.time()
+        with self.lock:
+            for job in self.jobs:
+                if job.next_run > now:
+                    continue
+
+                lag = now - job.next_run
+                job.stats["missed_runs"] += job.schedule_next(now)
+
+                if job.running >= job.max_instances:
+                    job.stats["overlaps_skipped"] += 1
+                    logging.warning(f"Job {job.name} still running, skipping this slot")
+                    continue
+
+                job.stats["last_lag"] = lag
+                job.stats["max_lag"] = max(job.stats["max_lag"], lag)
+                job.running += 1
+                self.executor.submit(self._run_job, job)
+
+    def _run_job(self, job):
+        start = time.perf_counter()
+        try:
+            job.func()
+            failed = False
+        except Exception as e:
+            failed = True
+            logging.exception(f"Job {job.name} failed: {e}")
+        duration = time.perf_counter() - start
+
+        with self.lock:
+            job.running -= 1
+            job.stats["runs"] += 1
+            job.stats["failures"] += failed
+            job.stats["last_duration"] = duration
+
+    def seconds_until_next(self):
+        with self.lock:
+            if not self.jobs:
+                return 1.0
+            return max(0.0, min(job.next_run for job in self.jobs) - time.time())
+
+    def metrics(self):
+        with self.lock:
+            return {job.name: dict(job.stats, running=job.running) for job in self.jobs}
+
+    def run_forever(self, install_signal_handlers=True):
+        if install_signal_handlers and threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop())
+
+        logging.info("Scheduler started")
+        try:
+            while not self.stop_event.is_set():
+                self.run_pending()
+                # Sleep until the next slot, but wake up promptly on stop()
+                self.stop_event.wait(min(self.seconds_until_next(), 1.0))
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def shutdown(self, wait=True):
+        # Lets running jobs finish; no new slots are started
+        self.stop_event.set()
+        self.executor.shutdown(wait=wait)
+        logging.info(f"Scheduler stopped: {self.metrics()}")
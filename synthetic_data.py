@@ -0,0 +1,66 @@
+import random
+import time
+
+# Same shape and failure modes as simulate_messy_data(), at any scale
+CITIES = ["Tokyo", "Chennai", "London", "Kolkata", "Delhi", "Mumbai", "Auckland",
+          "Hyderabad", "New York", "Melbourne"] + [f"City{i}" for i in range(190)]
+CONDITIONS = ["Sunny", "Cloudy", "Rainy", "Clear", "Hazy", "Windy", "Humid"]
+
+# Fraction of records hit by each defect; a record gets at most one invalidating defect
+DEFAULT_ERROR_RATES = {
+    "padding": 0.30,            # " Tokyo ", " 29.5 " - still valid after strip()
+    "temp_not_a_number": 0.02,  # "N/A"
+    "temp_with_unit": 0.02,     # "15C"
+    "temp_missing": 0.02,       # ""
+    "temp_out_of_range": 0.01,
+    "city_missing": 0.01,
+    "condition_missing": 0.01
+}
+
+
+def messy_records(count, seed=42, error_rates=None, cities=CITIES):
+    """Yield count raw records like the ones the cleaners receive.
+
+    The same seed always produces the same records.
+    """
+    rates = dict(DEFAULT_ERROR_RATES, **(error_rates or {}))
+    padding = rates.pop("padding")
+    defects = list(rates.items())
+    rng = random.Random(seed)
+
+    for _ in range(count):
+        city = rng.choice(cities)
+        temp = f"{rng.uniform(-10, 45):.1f}"
+        condition = rng.choice(CONDITIONS)
+
+        roll = rng.random()
+        for defect, rate in defects:
+            if roll < rate:
+                if defect == "temp_not_a_number":
+                    temp = "N/A"
+                elif defect == "temp_with_unit":
+                    temp = f"{temp}C"
+                elif defect == "temp_missing":
+                    temp = ""
+                elif defect == "temp_out_of_range":
+                    temp = f"{rng.choice((-1, 1)) * rng.uniform(61, 99):.1f}"
+                elif defect == "city_missing":
+                    city = ""
+                elif defect == "condition_missing":
+                    condition = ""
+                break
+            roll -= rate
+
+        if rng.random() < padding:
+            city, temp, condition = f"  {city} ", f" {temp} ", f" {condition}  "
+
+        yield {"city": city, "temperature": temp, "condition": condition}
+
+
+def weather_readings(count, seed=42, cities=CITIES, start=(2025, 1, 1), days=180):
+    """Yield (city, date, condition, temp) rows for the raw weather table."""
+    rng = random.Random(seed)
+    origin = time.mktime(start + (0, 0, 0, 0, 0, -1))
+    for _ in range(count):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(origin + rng.randrange(0, days * 86400)))
+        yield rng.choice(cities), stamp, rng.choice(CONDITIONS), round(rng.uniform(-10, 45), 1)
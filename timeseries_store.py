@@ -0,0 +1,241 @@
+"""In-process store of recent readings: one fixed-size ring per city.
+
+Every field is a column in a 2-D typed array with one row per city, so a
+reading costs 11 bytes (uint32 timestamp, float32 temp, uint8 humidity,
+uint16 condition code) and window aggregates over all cities are a handful
+of numpy operations instead of a query per city.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+NO_HUMIDITY = 255  # humidity is 0-100, so anything above marks "not reported"
+
+
+class Reading:
+    """One stored reading, materialised on demand."""
+
+    __slots__ = ("city", "timestamp", "temp", "humidity", "condition")
+
+    def __init__(self, city, timestamp, temp, humidity, condition):
+        self.city = city
+        self.timestamp = timestamp
+        self.temp = temp
+        self.humidity = humidity
+        self.condition = condition
+
+    def __repr__(self):
+        return (f"Reading({self.city!r}, {self.timestamp}, {self.temp}, "
+                f"{self.humidity}, {self.condition!r})")
+
+
+class WindowStats:
+    __slots__ = ("city", "count", "avg", "min", "max", "avg_humidity")
+
+    def __init__(self, city, count, avg, low, high, avg_humidity):
+        self.city = city
+        self.count = count
+        self.avg = avg
+        self.min = low
+        self.max = high
+        self.avg_humidity = avg_humidity
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"WindowStats({self.as_dict()})"
+
+
+# === Store ===
+class TimeSeriesStore:
+    """Last `capacity` readings per city in preallocated ring buffers.
+
+    append is O(1): write one slot per column and advance the city's head.
+    Readings are expected in time order per city, as the fetch loop produces them.
+    """
+
+    def __init__(self, capacity=1440, initial_cities=64):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.cities = []        # row -> city
+        self.rows = {}          # city -> row
+        self.conditions = []    # code -> condition text
+        self.condition_codes = {}
+        self._allocate(initial_cities)
+
+    def _allocate(self, city_rows):
+        shape = (city_rows, self.capacity)
+        old = getattr(self, "temps", None)
+        timestamps = np.zeros(shape, dtype=np.uint32)
+        temps = np.zeros(shape, dtype=np.float32)
+        humidity = np.full(shape, NO_HUMIDITY, dtype=np.uint8)
+        codes = np.zeros(shape, dtype=np.uint16)
+        heads = np.zeros(city_rows, dtype=np.int64)
+        counts = np.zeros(city_rows, dtype=np.int64)
+        if old is not None:
+            used = len(old)
+            timestamps[:used] = self.timestamps
+            temps[:used] = self.temps
+            humidity[:used] = self.humidity
+            codes[:used] = self.codes
+            heads[:used] = self.heads
+            counts[:used] = self.counts
+        self.timestamps, self.temps, self.humidity, self.codes = timestamps, temps, humidity, codes
+        self.heads, self.counts = heads, counts
+
+    def _row(self, city):
+        row = self.rows.get(city)
+        if row is None:
+            row = len(self.cities)
+            if row == len(self.heads):
+                # Rows double, so adding cities stays amortised O(1)
+                self._allocate(2 * row)
+            self.cities.append(city)
+            self.rows[city] = row
+        return row
+
+    def _code(self, condition):
+        code = self.condition_codes.get(condition)
+        if code is None:
+            code = self.condition_codes[condition] = len(self.conditions)
+            self.conditions.append(condition)
+        return code
+
+    # === Writes ===
+    def append(self, city, timestamp, temp, humidity=None, condition=""):
+        try:
+            humidity = int(humidity)
+        except (TypeError, ValueError):
+            humidity = NO_HUMIDITY
+        with self.lock:
+            row = self._row(city)
+            slot = self.heads[row]
+            self.timestamps[row, slot] = int(timestamp)
+            self.temps[row, slot] = temp
+            self.humidity[row, slot] = humidity if 0 <= humidity <= 100 else NO_HUMIDITY
+            self.codes[row, slot] = self._code(condition or "")
+            self.heads[row] = (slot + 1) % self.capacity
+            if self.counts[row] < self.capacity:
+                self.counts[row] += 1
+
+    # === Reads ===
+    def latest(self, city):
+        readings = self.recent(city, 1)
+        return readings[0] if readings else None
+
+    def recent(self, city, n):
+        """The last n readings for a city, oldest first, as Reading objects."""
+        with self.lock:
+            row = self.rows.get(city)
+            if row is None:
+                return []
+            n = min(n, self.counts[row])
+            slots = (self.heads[row] - np.arange(n, 0, -1)) % self.capacity
+            return [Reading(city, int(ts), float(temp), None if hum == NO_HUMIDITY else int(hum),
+                            self.conditions[code])
+                    for ts, temp, hum, code in zip(self.timestamps[row, slots].tolist(),
+                                                   self.temps[row, slots].tolist(),
+                                                   self.humidity[row, slots].tolist(),
+                                                   self.codes[row, slots].tolist())]
+
+    def windows(self, n=None, seconds=None, now=None, cities=None):
+        """avg/min/max over each city's last n readings and/or the last `seconds`.
+
+        Computed for every requested city at once over (cities x n) gathers.
+        """
+        with self.lock:
+            if cities is None:
+                names = list(self.cities)
+                rows = np.arange(len(names))
+            else:
+                names = [city for city in cities if city in self.rows]
+                rows = np.array([self.rows[city] for city in names], dtype=np.int64)
+            if not names:
+                return {}
+
+            depth = self.capacity if n is None else max(0, min(n, self.capacity))
+            offsets = np.arange(1, depth + 1)
+            slots = (self.heads[rows, None] - offsets) % self.capacity
+            valid = offsets <= self.counts[rows, None]
+            timestamps = self.timestamps[rows[:, None], slots]
+            temps = self.temps[rows[:, None], slots].astype(np.float64)
+            humidity = self.humidity[rows[:, None], slots]
+
+        if seconds is not None:
+            valid &= timestamps >= (now if now is not None else time.time()) - seconds
+
+        count = valid.sum(axis=1)
+        any_valid = count > 0
+        avg = temps.sum(axis=1, where=valid) / np.maximum(count, 1)
+        low = temps.min(axis=1, where=valid, initial=np.inf)
+        high = temps.max(axis=1, where=valid, initial=-np.inf)
+        has_humidity = valid & (humidity != NO_HUMIDITY)
+        humidity_count = has_humidity.sum(axis=1)
+        avg_humidity = humidity.sum(axis=1, where=has_humidity, dtype=np.int64) / np.maximum(humidity_count, 1)
+
+        return {
+            city: WindowStats(city, int(count[i]),
+                              float(avg[i]) if any_valid[i] else None,
+                              float(low[i]) if any_valid[i] else None,
+                              float(high[i]) if any_valid[i] else None,
+                              float(avg_humidity[i]) if humidity_count[i] else None)
+            for i, city in enumerate(names)
+        }
+
+    def window(self, city, n=None, seconds=None, now=None):
+        return self.windows(n, seconds, now, cities=[city]).get(city)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.timestamps, self.temps, self.humidity, self.codes))
+
+    @property
+    def bytes_per_reading(self):
+        return self.timestamps.itemsize + self.temps.itemsize + self.humidity.itemsize + self.codes.itemsize
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    # === Persistence ===
+    def snapshot(self, path):
+        """Write the store to an .npz file; renamed into place so it is never half-written."""
+        with self.lock:
+            used = len(self.cities)
+            arrays = dict(
+                capacity=np.array(self.capacity),
+                cities=np.array(self.cities, dtype=str),
+                conditions=np.array(self.conditions, dtype=str),
+                timestamps=self.timestamps[:used].copy(),
+                temps=self.temps[:used].copy(),
+                humidity=self.humidity[:used].copy(),
+                codes=self.codes[:used].copy(),
+                heads=self.heads[:used].copy(),
+                counts=self.counts[:used].copy()
+            )
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path, capacity=1440):
+        """Load a snapshot, or return an empty store when there is none yet."""
+        if not os.path.exists(path):
+            return cls(capacity)
+        with np.load(path) as data:
+            store = cls(int(data["capacity"]), initial_cities=max(len(data["cities"]), 1))
+            used = len(data["cities"])
+            store.timestamps[:used] = data["timestamps"]
+            store.temps[:used] = data["temps"]
+            store.humidity[:used] = data["humidity"]
+            store.codes[:used] = data["codes"]
+            store.heads[:used] = data["heads"]
+            store.counts[:used] = data["counts"]
+            store.cities = data["cities"].tolist()
+            store.rows = {city: row for row, city in enumerate(store.cities)}
+            store.conditions = data["conditions"].tolist()
+            store.condition_codes = {condition: code for code, condition in enumerate(store.conditions)}
+        return store
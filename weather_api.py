@@ -0,0 +1,317 @@
+"""Read-only HTTP API over the weather store.
+
+    GET /latest                      latest reading for every city
+    GET /latest/<city>               latest reading for one city
+    GET /history/<city>?hours=24     recent readings for one city, newest first
+    GET /daily?days=7[&city=London]  daily summaries
+    GET /window[/<city>]?n=60        rolling avg/min/max (needs a TimeSeriesStore)
+
+/latest is answered from a LatestCache. Inside a pipeline process the
+WeatherWriter pushes every flushed batch into it, so dashboards polling
+/latest never touch the database. History and daily summaries go to indexed
+queries, with results reused for `ttl` seconds.
+
+    python weather_api.py --port 8080 --db weather.db
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import metrics
+from db import Database
+
+# Newest row per city; last_updated points at it and (city, date) is indexed
+LATEST_ALL = '''
+    SELECT city, date, state, temp FROM weather
+    WHERE rowid IN (
+        SELECT MAX(w.rowid)
+        FROM last_updated l
+        JOIN weather w ON w.city = l.city AND w.date = l.last_fetch
+        GROUP BY l.city
+    )
+'''
+
+LATEST_CITY = '''
+    SELECT city, date, state, temp FROM weather
+    WHERE city = ?
+    ORDER BY date DESC
+    LIMIT 1
+'''
+
+HISTORY = '''
+    SELECT date, state, temp FROM weather
+    WHERE city = ? AND date >= ?
+    ORDER BY date DESC
+    LIMIT ?
+'''
+
+DAILY_ALL = '''
+    SELECT city, date, avg_temp, min_temp, max_temp, category FROM daily_summary_new
+    WHERE date >= ?
+    ORDER BY city, date
+'''
+
+DAILY_CITY = '''
+    SELECT city, date, avg_temp, min_temp, max_temp, category FROM daily_summary_new
+    WHERE city = ? AND date >= ?
+    ORDER BY date
+'''
+
+
+def reading(city, date, condition, temp):
+    return {"city": city, "date": date, "condition": condition, "temp": temp}
+
+
+# === Hot cache ===
+class LatestCache:
+    """Latest reading per city, updated by the ingest path.
+
+    The JSON body for the full set is encoded once per change, so repeated
+    polls between writes cost a dict lookup. Versions restart with the process,
+    so ETags also carry an epoch taken when the cache is created.
+    """
+
+    def __init__(self):
+        self.readings = {}
+        self.version = 0
+        self.epoch = format(time.time_ns(), "x")
+        self.lock = threading.Lock()
+        self._body = None
+        self._body_version = -1
+
+    def update(self, rows):
+        """Take (city, date, condition, temp, ...) rows; older readings are ignored."""
+        with self.lock:
+            changed = False
+            for city, date, condition, temp, *_ in rows:
+                current = self.readings.get(city)
+                if current is None or date >= current["date"]:
+                    self.readings[city] = reading(city, date, condition, temp)
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def get(self, city):
+        with self.lock:
+            return self.readings.get(city)
+
+    def body(self):
+        """(ETag, encoded JSON of every city's latest reading)."""
+        with self.lock:
+            if self._body_version != self.version:
+                self._body = json.dumps(sorted(self.readings.values(), key=lambda r: r["city"])).encode("utf-8")
+                self._body_version = self.version
+            return f'"{self.epoch}-{self.version}"', self._body
+
+    def __len__(self):
+        return len(self.readings)
+
+
+# === Read service ===
+class ReadService:
+    """Query layer behind the API.
+
+    refresh_interval re-reads the latest set from the database at most that
+    often; leave it None when a WeatherWriter in the same process feeds the cache.
+    store is an optional timeseries_store.TimeSeriesStore fed by the same process.
+    """
+
+    def __init__(self, db_path='weather.db', cache=None, ttl=5.0, refresh_interval=None, max_connections=4,
+                 store=None):
+        # Own pool, so API reads never wait for a connection the pipeline is holding
+        self.db = Database(db_path, max_size=max_connections)
+        self.cache = cache if cache is not None else LatestCache()
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.store = store
+        self.db_queries = 0
+        self.results = {}
+        self.lock = threading.Lock()
+        self.refreshed_at = None
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            self.db_queries += 1
+        metrics.inc("api_db_queries_total")
+        return self.db.query(sql, params)
+
+    def _cached(self, key, load):
+        # Short-lived result cache for the DB-backed endpoints
+        now = time.monotonic()
+        with self.lock:
+            hit = self.results.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+        value = load()
+        with self.lock:
+            if len(self.results) > 10000:
+                self.results.clear()
+            self.results[key] = (now + self.ttl, value)
+        return value
+
+    def warm(self):
+        self.cache.update(self._query(LATEST_ALL))
+        self.refreshed_at = time.monotonic()
+        return len(self.cache)
+
+    def _maybe_refresh(self):
+        if self.refreshed_at is None:
+            self.warm()
+        elif self.refresh_interval and time.monotonic() - self.refreshed_at >= self.refresh_interval:
+            self.warm()
+
+    def latest_body(self):
+        self._maybe_refresh()
+        return self.cache.body()
+
+    def latest(self, city):
+        self._maybe_refresh()
+        found = self.cache.get(city)
+        if found is not None:
+            return found
+        # Not seen by this process yet; the (city, date) index makes this one probe
+        rows = self._cached(("latest", city), lambda: self._query(LATEST_CITY, (city,)))
+        if not rows:
+            return None
+        self.cache.update(rows)
+        return reading(*rows[0])
+
+    def history(self, city, hours=24, limit=1000):
+        since = (datetime.now() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+        # Truncate to the minute so polls within the same minute share a cache entry
+        rows = self._cached(("history", city, since[:16], limit),
+                            lambda: self._query(HISTORY, (city, since[:16], limit)))
+        return [{"date": date, "condition": condition, "temp": temp} for date, condition, temp in rows]
+
+    def daily(self, city=None, days=7):
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        if city:
+            rows = self._cached(("daily", city, since), lambda: self._query(DAILY_CITY, (city, since)))
+        else:
+            rows = self._cached(("daily", None, since), lambda: self._query(DAILY_ALL, (since,)))
+        return [{"city": c, "date": d, "avg_temp": avg, "min_temp": low, "max_temp": high, "category": category}
+                for c, d, avg, low, high, category in rows]
+
+    def windows(self, city=None, n=None, minutes=None):
+        # Served from memory only; there is no DB fallback for rolling windows
+        if self.store is None:
+            return None
+        seconds = minutes * 60 if minutes is not None else None
+        stats = self.store.windows(n, seconds, cities=[city] if city else None)
+        return [window.as_dict() for window in stats.values()]
+
+    def close(self):
+        self.db.close()
+
+
+# === HTTP ===
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive clients wait ~40ms each
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        endpoint = parts[0] if parts else ""
+        start = time.perf_counter()
+
+        try:
+            if endpoint == "latest" and len(parts) == 1:
+                etag, body = service.latest_body()
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", etag=etag)
+                else:
+                    self._send(200, body, etag=etag)
+            elif endpoint == "latest" and len(parts) == 2:
+                found = service.latest(parts[1])
+                if found is None:
+                    self._json(404, {"error": f"No readings for {parts[1]}"})
+                else:
+                    self._json(200, found)
+            elif endpoint == "history" and len(parts) == 2:
+                self._json(200, service.history(parts[1], float(query.get("hours", 24)),
+                                                int(query.get("limit", 1000))))
+            elif endpoint == "daily" and len(parts) <= 2:
+                city = parts[1] if len(parts) == 2 else query.get("city")
+                self._json(200, service.daily(city, int(query.get("days", 7))))
+            elif endpoint == "window" and len(parts) <= 2:
+                minutes = query.get("minutes")
+                stats = service.windows(parts[1] if len(parts) == 2 else None,
+                                        int(query["n"]) if "n" in query else None,
+                                        float(minutes) if minutes is not None else None)
+                if stats is None:
+                    self._json(404, {"error": "No recent-readings store in this process"})
+                else:
+                    self._json(200, stats)
+            else:
+                self._json(404, {"error": f"Unknown path {url.path}"})
+        except ValueError as e:
+            self._json(400, {"error": str(e)})
+        except service.db.errors:
+            # Locked or unreachable database: the client can retry, the connection stays usable
+            metrics.inc("api_db_errors_total", endpoint=endpoint)
+            self._json(503, {"error": "Database unavailable"})
+        finally:
+            metrics.observe("api_request_seconds", time.perf_counter() - start, endpoint=endpoint or "unknown")
+
+    def _json(self, status, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, service, address=("", 8080)):
+        super().__init__(address, _ApiHandler)
+        self.service = service
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def start_api_server(service, port=8080, host=""):
+    """Serve the API from a daemon thread."""
+    return ApiServer(service, (host, port)).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve latest conditions, history and daily summaries.")
+    parser.add_argument("--db", default="weather.db")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--refresh", type=float, default=5.0,
+                        help="seconds between re-reads of the latest set (no ingest in this process)")
+    parser.add_argument("--ttl", type=float, default=5.0, help="seconds to reuse history/daily results")
+    args = parser.parse_args()
+
+    service = ReadService(args.db, ttl=args.ttl, refresh_interval=args.refresh)
+    server = ApiServer(service, (args.host, args.port))
+    print(f"Serving weather API on port {server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
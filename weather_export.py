@@ -0,0 +1,103 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+
+from db import get_database
+
+EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# === Output helpers ===
+def open_text_output(raw, compression=None):
+    if compression is None:
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    if compression == "gzip":
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode="wb"), encoding="utf-8", newline="")
+    if compression == "zstd":
+        import zstandard
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding="utf-8", newline="")
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def output_path(filename, compression=None):
+    extension = EXTENSIONS[compression]
+    return filename if filename.endswith(extension) else filename + extension
+
+
+def delta_path(path, first_rowid, last_rowid, compression=None):
+    # x.csv.gz -> x.rows-101-250.csv.gz, so every incremental run keeps its own file
+    extension = EXTENSIONS[compression]
+    root, ext = os.path.splitext(path[:len(path) - len(extension)] if extension else path)
+    return f"{root}.rows-{first_rowid}-{last_rowid}{ext}{extension}"
+
+
+# === Watermark ===
+def get_watermark(conn, name):
+    row = conn.execute('SELECT last_rowid FROM export_watermark WHERE name = ?', (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def set_watermark(conn, name, last_rowid):
+    conn.execute('''
+        INSERT INTO export_watermark (name, last_rowid)
+        VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET last_rowid = excluded.last_rowid
+    ''', (name, last_rowid))
+    conn.commit()
+
+
+# === Streaming export ===
+def export_weather_to_csv(db_path, filename, header=('City', 'Date', 'Condition', 'Temperature'),
+                          format_row=None, compression=None, incremental=False,
+                          watermark_name="csv_export", chunk_size=5000):
+    """Stream the weather table to CSV without loading it into memory.
+
+    The file is written to a temp file and renamed into place, so readers never
+    see a partial export. With incremental=True only rows added since the last
+    export under watermark_name are written, to a file named after their rowid
+    range; an existing file is never replaced and an empty delta writes nothing.
+    Returns (path, rows_written), with path None when there was nothing new.
+    """
+    path = output_path(filename, compression)
+    format_row = format_row or (lambda row: row)
+
+    with get_database(db_path).connection() as conn:
+        last_rowid = get_watermark(conn, watermark_name) if incremental else 0
+        cursor = conn.execute('''
+            SELECT rowid, city, date, state, temp FROM weather
+            WHERE rowid > ?
+            ORDER BY rowid
+        ''', (last_rowid,))
+        chunk = cursor.fetchmany(chunk_size)
+        if incremental and not chunk:
+            return None, 0
+        first_rowid = chunk[0][0] if chunk else None
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".export_", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+        rows_written = 0
+        max_rowid = last_rowid
+        try:
+            with os.fdopen(fd, "wb") as raw, open_text_output(raw, compression) as file:
+                writer = csv.writer(file)
+                writer.writerow(header)
+                while chunk:
+                    writer.writerows(format_row(row[1:]) for row in chunk)
+                    rows_written += len(chunk)
+                    max_rowid = chunk[-1][0]
+                    chunk = cursor.fetchmany(chunk_size)
+            if incremental:
+                path = delta_path(path, first_rowid, max_rowid, compression)
+                if os.path.exists(path):
+                    # Same range exported before (e.g. a reset watermark); keep the earlier file
+                    raise FileExistsError(f"{path} already exists, not overwriting it")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Only move the watermark once the file is safely in place
+        if incremental:
+            set_watermark(conn, watermark_name, max_rowid)
+        return path, rows_written
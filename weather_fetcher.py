@@ -0,0 +1,141 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from resilience import Deadline, DeadlineExceeded, HostBreakers, RetryPolicy, call_with_retries
+from wttr_parser import parse_weather_payload
+
+WTTR_URL = "https://wttr.in/{city}?format=j1"
+
+# Fail fast on an unreachable host; a slow but connected upstream gets longer
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+# Kept across runs so a dead upstream stays short-circuited between scheduled jobs
+_breakers = HostBreakers(failure_threshold=5, reset_timeout=30)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# === Per-host rate limiting ===
+class HostRateLimiter:
+    def __init__(self, per_second=10):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, host, budget=float("inf")):
+        """Take the host's next slot and return the seconds until it.
+
+        Returns None, without taking the slot, when it is budget seconds or more away.
+        """
+        if not self.interval:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            if slot - now >= budget:
+                return None
+            self.next_slot[host] = slot + self.interval
+        return slot - now
+
+    def wait(self, host, deadline=None):
+        # The wait is charged to the deadline before sleeping, so queued calls cannot overshoot it
+        delay = self.reserve(host, deadline.remaining() if deadline is not None else float("inf"))
+        if delay is None:
+            metrics.inc("rate_limit_deadline_total", host=host)
+            raise DeadlineExceeded(f"Run deadline reached before the next request slot for {host}")
+        if delay > 0:
+            time.sleep(delay)
+
+
+# === Shared keep-alive session ===
+def make_session(pool_size=16):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(pool_size=16):
+    # One session per process so connections stay open between scheduled runs
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session(pool_size)
+        return _session
+
+
+def fetch_city(session, limiter, city, url_template=WTTR_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+               cache=None, retry=None, breakers=None, deadline=None):
+    url = url_template.format(city=city)
+    host = urlsplit(url).netloc
+
+    def send(headers, request_timeout):
+        # Rate limit only real upstream calls, not cache hits
+        limiter.wait(host, deadline)
+        if deadline is not None:
+            # Whatever the wait used is no longer available to the request
+            request_timeout = deadline.clamp(request_timeout)
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=request_timeout)
+        except Exception:
+            metrics.inc("http_requests_total", city=city, status="error")
+            raise
+        metrics.observe("http_request_seconds", time.perf_counter() - start, city=city)
+        metrics.inc("http_requests_total", city=city, status=response.status_code)
+        return response
+
+    def request(headers=None):
+        # Backoff, circuit breaker and deadline apply to every upstream call, cached or not
+        return call_with_retries(lambda request_timeout: send(headers, request_timeout), host, timeout,
+                                 retry, breakers, deadline, label=city)
+
+    if cache is not None:
+        return cache.get(url, request)
+
+    response = request()
+    response.raise_for_status()
+    return parse_weather_payload(response.content)
+
+
+# === Concurrent fetch stage ===
+def fetch_all(cities, max_workers=16, rate_per_host=10, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+              url_template=WTTR_URL, session=None, cache=None, retry=None, breakers=None, deadline=None):
+    """Fetch every city concurrently and return (city, data, error) tuples in input order.
+
+    Failed requests are retried with jittered backoff (retry, a RetryPolicy).
+    breakers defaults to the process-wide per-host circuit breakers, and
+    deadline is the time budget in seconds for the whole call.
+    """
+    if not cities:
+        return []
+
+    session = session or get_session(max_workers)
+    limiter = HostRateLimiter(rate_per_host)
+    workers = min(max_workers, len(cities))
+    retry = retry or RetryPolicy()
+    breakers = _breakers if breakers is None else breakers
+    run_deadline = Deadline(deadline)
+    # Pool threads do not inherit the caller's thread-local run; hand it over so their counters land in it
+    run = metrics.current_run()
+
+    def task(city):
+        with metrics.attach(run):
+            try:
+                data = fetch_city(session, limiter, city, url_template, timeout, cache, retry, breakers,
+                                  run_deadline)
+                return city, data, None
+            except Exception as e:
+                return city, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(task, cities))
@@ -0,0 +1,114 @@
+import uuid
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from db import get_database
+from weather_export import get_watermark, set_watermark
+
+SCHEMA = pa.schema([
+    ("city", pa.string()),
+    ("observed_at", pa.timestamp("s")),
+    ("condition", pa.string()),
+    ("temp", pa.float64()),
+    ("day", pa.date32())
+])
+
+# Hive-style folders: day=2025-04-08/city=Tokyo/part-....parquet
+PARTITIONING = ds.partitioning(pa.schema([("day", pa.date32()), ("city", pa.string())]), flavor="hive")
+
+
+def rows_to_table(rows):
+    city, observed, condition, temp = zip(*rows)
+    observed_at = pc.strptime(pa.array(observed, pa.string()), format="%Y-%m-%d %H:%M:%S",
+                              unit="s", error_is_null=True)
+    return pa.table({
+        "city": pa.array(city, pa.string()),
+        "observed_at": observed_at,
+        "condition": pa.array(condition, pa.string()),
+        "temp": pa.array(temp, pa.float64()),
+        "day": pc.cast(observed_at, pa.date32())
+    }, schema=SCHEMA)
+
+
+# === Writer ===
+def export_weather_to_parquet(db_path, root="weather_parquet", incremental=True,
+                              watermark_name="parquet_export", chunk_size=100000):
+    """Append weather rows to a Parquet dataset partitioned by day and city.
+
+    Each call writes new part files only, so earlier partitions are never
+    rewritten. Returns the number of rows exported.
+    """
+    with get_database(db_path).connection() as conn:
+        last_rowid = get_watermark(conn, watermark_name) if incremental else 0
+        cursor = conn.execute('''
+            SELECT rowid, city, date, state, temp FROM weather
+            WHERE rowid > ?
+            ORDER BY rowid
+        ''', (last_rowid,))
+
+        run_id = uuid.uuid4().hex[:12]
+        rows_written = 0
+        chunk_number = 0
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            table = rows_to_table([row[1:] for row in chunk])
+            ds.write_dataset(
+                table, root, format="parquet", partitioning=PARTITIONING,
+                basename_template=f"part-{run_id}-{chunk_number}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+            rows_written += len(chunk)
+            chunk_number += 1
+
+            # Advance per chunk so a crash mid-export does not duplicate finished parts
+            if incremental:
+                set_watermark(conn, watermark_name, chunk[-1][0])
+        return rows_written
+
+
+# === Reader ===
+def weather_dataset(root="weather_parquet"):
+    return ds.dataset(root, format="parquet", schema=SCHEMA, partitioning=PARTITIONING)
+
+
+def build_filter(cities=None, start=None, end=None, where=None):
+    # Filters on day/city prune whole partitions before any file is opened
+    expression = None
+
+    def both(left, right):
+        return right if left is None else left & right
+
+    if cities:
+        expression = both(expression, ds.field("city").isin(list(cities)))
+    if start:
+        expression = both(expression, ds.field("day") >= pa.scalar(_as_date(start), pa.date32()))
+    if end:
+        expression = both(expression, ds.field("day") <= pa.scalar(_as_date(end), pa.date32()))
+    if where is not None:
+        expression = both(expression, where)
+    return expression
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def read_weather(root="weather_parquet", columns=None, cities=None, start=None, end=None, where=None):
+    """Read weather history back as an Arrow table.
+
+    Only the requested columns are decoded, and day/city filters skip
+    non-matching partitions; `where` adds any extra dataset expression,
+    e.g. ds.field("temp") > 30, which is pushed down to row-group statistics.
+    """
+    expression = build_filter(cities, start, end, where)
+    return weather_dataset(root).to_table(columns=columns, filter=expression)
+
+
+def scan_weather(root="weather_parquet", columns=None, cities=None, start=None, end=None, where=None):
+    expression = build_filter(cities, start, end, where)
+    yield from weather_dataset(root).to_batches(columns=columns, filter=expression)
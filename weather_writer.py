@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+
+import metrics
+from db import get_database
+from pg_sink import PostgresSink
+
+INSERT_WEATHER = '''
+    INSERT INTO weather (city, date, state, temp)
+    VALUES (?, ?, ?, ?)
+'''
+
+UPSERT_LAST_UPDATED = '''
+    INSERT INTO last_updated (city, last_fetch, observation_key)
+    VALUES (?, ?, ?)
+    ON CONFLICT(city) DO UPDATE SET
+        last_fetch = excluded.last_fetch,
+        observation_key = COALESCE(excluded.observation_key, last_updated.observation_key)
+'''
+
+
+# === Batched writer ===
+class WeatherWriter:
+    """Buffers readings and writes them in one transaction per flush."""
+
+    def __init__(self, db_path='weather.db', batch_size=500, flush_interval=5.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.rows_written = 0
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        # Called with each written batch, e.g. weather_api.LatestCache.update
+        self.listeners = []
+
+        self.db = get_database(db_path)
+        # On Postgres, batches go through COPY and a staged last_updated merge
+        self.sink = PostgresSink(db_path) if self.db.backend == "postgres" else None
+
+        self._stop = threading.Event()
+        self._timer = None
+        if flush_interval:
+            self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._timer.start()
+
+    def add(self, city, date, condition, temp, observation_key=None):
+        with self.lock:
+            self.buffer.append((city, date, condition, temp, observation_key))
+            due = (len(self.buffer) >= self.batch_size or
+                   (self.flush_interval and time.monotonic() - self.last_flush >= self.flush_interval))
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                self.last_flush = time.monotonic()
+                return 0
+            rows, self.buffer = self.buffer, []
+
+            try:
+                if self.sink is not None:
+                    self.sink.write_weather(rows)
+                else:
+                    self._write(rows)
+            except Exception:
+                # Keep the rows so the next flush can retry them
+                self.buffer = rows + self.buffer
+                raise
+
+            self.rows_written += len(rows)
+            self.last_flush = time.monotonic()
+            for listener in self.listeners:
+                try:
+                    listener(rows)
+                except Exception as e:
+                    logging.error(f"Writer listener {listener!r} failed: {e}")
+            return len(rows)
+
+    def _write(self, rows):
+        # Only the newest fetch per city matters for last_updated
+        latest = {}
+        for city, date, _, _, observation_key in rows:
+            if city not in latest or date > latest[city][0]:
+                latest[city] = (date, observation_key)
+
+        start = time.perf_counter()
+        with self.db.transaction() as conn:
+            self.db.executemany(conn, INSERT_WEATHER, [row[:4] for row in rows])
+            self.db.executemany(conn, UPSERT_LAST_UPDATED,
+                                [(city, date, key) for city, (date, key) in latest.items()])
+        metrics.observe("db_commit_seconds", time.perf_counter() - start, table="weather")
+        metrics.inc("rows_written_total", len(rows), table="weather")
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Periodic flush to {self.db_path} failed: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._timer:
+            self._timer.join()
+        # The connection belongs to the shared pool, so only the buffer is flushed
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
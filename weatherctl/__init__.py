@@ -0,0 +1,20 @@
+"""Command line and programmatic entry points for the weather pipelines.
+
+    python -m weatherctl fetch
+    python -m weatherctl run-scheduler --pipeline refined
+
+Nothing heavy is imported here; each subcommand imports what it needs.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEANING_DIR = os.path.join(ROOT, "Weather Pipeline")
+
+
+def use_repo_modules(cleaning=False):
+    """Make the repository's top-level modules (and optionally the cleaning ones) importable."""
+    paths = [ROOT, CLEANING_DIR] if cleaning else [ROOT]
+    for path in paths:
+        if path not in sys.path:
+            sys.path.insert(0, path)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+if __package__ in (None, ""):
+    # Run as `python path/to/weatherctl`: make the package itself importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weatherctl.cli import main
+
+sys.exit(main())
@@ -0,0 +1,143 @@
+"""One CLI for every pipeline stage.
+
+    python -m weatherctl fetch [--pipeline refined|first] [--cities London,Tokyo]
+    python -m weatherctl clean
+    python -m weatherctl summarize
+    python -m weatherctl export [--format csv|parquet] [--incremental]
+    python -m weatherctl report
+    python -m weatherctl run-scheduler [--pipeline refined|first] [--api-port 8080]
+
+Only argparse is imported up front. Each command imports its own modules, so
+`summarize` never loads requests or numpy and a cron run starts quickly.
+"""
+import argparse
+import os
+
+from weatherctl import use_repo_modules
+
+PIPELINES = {"refined": "Refined_pipeline", "first": "first_pipeline"}
+
+
+def db_path(args):
+    return args.db or os.environ.get("WEATHER_DB", "weather.db")
+
+
+def load_pipeline(name):
+    import importlib
+    return importlib.import_module(PIPELINES[name])
+
+
+# === Commands ===
+def cmd_fetch(args):
+    pipeline = load_pipeline(args.pipeline)
+    pipeline.setup_logging()
+    pipeline.setup(db_path(args), live=False)
+    try:
+        cities = args.cities.split(",") if args.cities else pipeline.city_registry.names()
+        pipeline.fetch_and_store(cities)
+    finally:
+        pipeline.close()
+    return 0
+
+
+def cmd_clean(args):
+    use_repo_modules(cleaning=True)
+    import main as cleaning
+
+    total, cleaned, skipped = cleaning.clean(args.db)
+    print(f"Cleaned {cleaned} of {total} records, skipped {skipped}")
+    return 0
+
+
+def cmd_summarize(args):
+    import retention
+
+    # Hourly and daily rollups advance together, from rowid watermarks
+    hourly, daily = retention.rollup(db_path(args))
+    print(f"Summaries updated with {daily} new readings")
+    return 0
+
+
+def cmd_export(args):
+    if args.format == "parquet":
+        import weather_parquet
+
+        count = weather_parquet.export_weather_to_parquet(db_path(args), root=args.output or "weather_parquet",
+                                                          incremental=args.incremental)
+        print(f"Exported {count} rows to {args.output or 'weather_parquet'}/")
+        return 0
+
+    import weather_export
+    from datetime import datetime
+
+    filename = args.output or f"weather_{datetime.now():%Y-%m-%d}.csv"
+    path, count = weather_export.export_weather_to_csv(db_path(args), filename, compression=args.compression,
+                                                       incremental=args.incremental)
+    print(f"Exported {count} rows to {path}" if path else "No new rows since the last export")
+    return 0
+
+
+def cmd_report(args):
+    use_repo_modules(cleaning=True)
+    import main as cleaning
+
+    cleaning.report(args.db, output_folder=args.output_folder, use_cache=not args.no_cache)
+    return 0
+
+
+def cmd_run_scheduler(args):
+    pipeline = load_pipeline(args.pipeline)
+    pipeline.setup_logging()
+    pipeline.setup(db_path(args))
+    # Blocks until SIGINT/SIGTERM
+    pipeline.run_scheduler(args.workers, metrics_port=args.metrics_port, api_port=args.api_port)
+    return 0
+
+
+# === Parser ===
+def build_parser():
+    parser = argparse.ArgumentParser(prog="weatherctl", description="Weather pipeline stages.")
+    parser.add_argument("--db", help="database path or postgres URL (default: $WEATHER_DB, then weather.db; "
+                                     "clean and report default to the cleaning config's db_path)")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="fetch every configured city once and store the readings")
+    fetch.add_argument("--pipeline", choices=PIPELINES, default="refined")
+    fetch.add_argument("--cities", help="comma-separated cities instead of the config's list")
+    fetch.set_defaults(func=cmd_fetch)
+
+    clean = commands.add_parser("clean", help="clean raw records into cleaned_weather")
+    clean.set_defaults(func=cmd_clean)
+
+    summarize = commands.add_parser("summarize", help="fold new readings into the hourly and daily summaries")
+    summarize.set_defaults(func=cmd_summarize)
+
+    export = commands.add_parser("export", help="export the weather table")
+    export.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    export.add_argument("--output", help="CSV file or Parquet dataset folder")
+    export.add_argument("--compression", choices=("gzip", "zstd"), help="CSV only")
+    export.add_argument("--incremental", action="store_true", help="only rows added since the last export")
+    export.set_defaults(func=cmd_export)
+
+    report = commands.add_parser("report", help="write the cleaned-weather report")
+    report.add_argument("--output-folder", help="default: the cleaning config's output_folder")
+    report.add_argument("--no-cache", action="store_true", help="rescan cleaned_weather and always write a new file")
+    report.set_defaults(func=cmd_report)
+
+    scheduler = commands.add_parser("run-scheduler", help="run a pipeline's jobs on their schedules")
+    scheduler.add_argument("--pipeline", choices=PIPELINES, default="refined")
+    scheduler.add_argument("--workers", type=int, default=4)
+    scheduler.add_argument("--metrics-port", type=int, default=int(os.environ.get("WEATHER_METRICS_PORT") or 0))
+    scheduler.add_argument("--api-port", type=int, default=int(os.environ.get("WEATHER_API_PORT") or 0),
+                           help="serve the read API (refined pipeline only)")
+    scheduler.set_defaults(func=cmd_run_scheduler)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.db:
+        # Pipeline runs recorded by metrics.PipelineRun land in the same database
+        os.environ["WEATHER_DB"] = args.db
+    use_repo_modules()
+    return args.func(args)
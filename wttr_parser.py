@@ -0,0 +1,51 @@
+import json
+
+# orjson is optional; it is only used when the whole payload has to be parsed
+try:
+    import orjson
+    full_loads = orjson.loads
+except ImportError:
+    full_loads = json.loads
+
+CURRENT_KEY = b'"current_condition"'
+_decoder = json.JSONDecoder()
+
+
+def extract_current_condition(body, window=4096):
+    """Return the current_condition list from a wttr.in j1 body without parsing the rest.
+
+    The j1 payload is dominated by the hourly forecast under "weather"; here
+    only a growing window after the "current_condition" key is decoded, and
+    decoding stops at the end of that array.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    key_at = body.find(CURRENT_KEY)
+    if key_at == -1:
+        return None
+    start = body.find(b"[", key_at + len(CURRENT_KEY))
+    if start == -1:
+        return None
+
+    while True:
+        end = start + window
+        # A cut in the middle of a multi-byte character only affects the truncated tail
+        text = body[start:end].decode("utf-8", errors="ignore")
+        try:
+            value, _ = _decoder.raw_decode(text)
+            return value
+        except json.JSONDecodeError:
+            if end >= len(body):
+                return None
+            window *= 4
+
+
+def parse_weather_payload(body):
+    """Parse a j1 body into {"current_condition": [...]}, the only part the pipelines read."""
+    current = extract_current_condition(body)
+    if current is None:
+        # Unexpected layout: fall back to a full parse with the fastest backend available
+        data = full_loads(body)
+        current = data["current_condition"]
+    return {"current_condition": current}